@@ -0,0 +1,98 @@
+import time
+from array import array
+from collections import deque
+
+
+# --- FRAME PACING ---
+class FrameGovernor:
+    """Paces an after()-driven animation loop and records how long each frame took.
+
+    begin_frame() returns how many animation steps to advance: 1 normally, more when the event loop was
+    busy and the tick arrived late (the in-between frames are dropped instead of replayed). end_frame()
+    returns the delay until the next tick; with a budget_ms set, the interval stretches while frames cost
+    more than the budget and relaxes back once they're cheap again.
+    """
+
+    def __init__(self, interval_ms, budget_ms=None, max_interval_ms=None, max_catch_up=5, window=60):
+        self.base_interval_ms = interval_ms
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.max_interval_ms = max_interval_ms or interval_ms * 4
+        self.max_catch_up = max_catch_up
+        self.frame_costs = deque(maxlen=window)  # ms spent inside each of the last N frames
+        self.frames = 0
+        self.dropped = 0
+        self._last_tick = None
+        self._frame_start = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        steps = 1
+        if self._last_tick is not None:
+            elapsed_ms = (now - self._last_tick) * 1000
+            if elapsed_ms < self.interval_ms * self.max_catch_up * 2:  # longer gaps are pauses, not lag
+                steps = max(1, min(self.max_catch_up, round(elapsed_ms / self.interval_ms)))
+        self.dropped += steps - 1
+        self._last_tick = now
+        self._frame_start = now
+        return steps
+
+    def end_frame(self):
+        cost_ms = (time.perf_counter() - self._frame_start) * 1000
+        self.frames += 1
+        self.frame_costs.append(cost_ms)
+        if self.budget_ms is not None:
+            avg_ms = sum(self.frame_costs) / len(self.frame_costs)
+            if avg_ms > self.budget_ms:
+                self.interval_ms = min(self.max_interval_ms, int(self.interval_ms * 1.25) + 1)
+            elif avg_ms < self.budget_ms / 2 and self.interval_ms > self.base_interval_ms:
+                self.interval_ms = max(self.base_interval_ms, int(self.interval_ms * 0.9))
+        return self.interval_ms
+
+    def stats(self):
+        costs = list(self.frame_costs)
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "interval_ms": self.interval_ms,
+            "budget_ms": self.budget_ms,
+            "last_ms": costs[-1] if costs else 0.0,
+            "avg_ms": sum(costs) / len(costs) if costs else 0.0,
+            "max_ms": max(costs) if costs else 0.0,
+        }
+
+
+# --- GLYPHS ---
+class GlyphRing:
+    """A fixed ring of pre-built glyph streams ("A\\n7\\n#"); next() cycles through it without allocating."""
+
+    def __init__(self, chars, rng, size=64, min_len=3, max_len=8):
+        self.streams = tuple("\n".join(rng.choice(chars) for _ in range(rng.randint(min_len, max_len)))
+                             for _ in range(size))
+        self.index = rng.randrange(size)
+
+    def next(self):
+        self.index = (self.index + 1) % len(self.streams)
+        return self.streams[self.index]
+
+
+# --- TRAJECTORIES ---
+def fall_path(start_y, speed, height, gap=None):
+    # Every y a falling item visits from start_y until it drops past height, one entry per step.
+    # gap=(top, bottom) is a band the item skips over in one jump (columns behind the app window).
+    path = array('i')
+    y = start_y
+    while y <= height:
+        path.append(y)
+        next_y = y + speed
+        if gap and (y < gap[0] <= next_y or gap[0] <= y < gap[1]):
+            next_y = gap[1]
+        y = next_y
+    if not path:
+        path.append(start_y)
+    return path
+
+
+def coords_script(widget_path, moves):
+    # One Tcl script that repositions many canvas items: a single interpreter round trip per frame
+    return "\n".join(f"{widget_path} coords {item} {x} {y}" for item, x, y in moves)
@@ -0,0 +1,2 @@
+# Headless performance benchmarks for the task database.
+# Run a suite with: python -m benchmarks.bench_tree_ops
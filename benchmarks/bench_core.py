@@ -0,0 +1,160 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.generators import build_synthetic_db, cleanup_db
+from reports import build_project_report, build_week_report, project_report_lines, stream_report, week_report_lines
+
+
+class _Undo(Exception):
+    pass
+
+
+# --- OPERATIONS ---
+def operations(db, root_ids):
+    # name -> (fn, writes). Write operations run inside a batch that is rolled back afterwards,
+    # so every repeat sees the same database.
+    biggest = max(root_ids, key=lambda r: len(db.get_task_hierarchy(r)))
+    open_roots = [t['id'] for t in db.get_tasks() if t['status'] != 'COMPLETED']
+    target = open_roots[0] if open_roots else biggest
+    archived = db.get_all_archived_tasks()
+    reopen_target = archived[0]['id'] if archived else biggest
+    # A page from the middle of the archive, as the list reaches it while scrolling
+    dated = [t for t in archived if t['completed_at']]
+    middle = dated[len(dated) // 2] if dated else None
+    page_cursor = (middle['completed_at'], middle['id']) if middle else None
+
+    today = datetime.now()
+    start = today - timedelta(days=today.weekday())
+    s_str = start.strftime("%Y-%m-%d 00:00:00")
+    e_str = (start + timedelta(days=6)).strftime("%Y-%m-%d 23:59:59")
+    week_rows = db.get_tasks_for_report(s_str, e_str)
+    hierarchy = db.get_task_hierarchy(biggest, include_notes=True)
+
+    return {
+        "get_task_hierarchy": (lambda: db.get_task_hierarchy(biggest), False),
+        "mark_completed": (lambda: db.mark_completed(target), True),
+        "reopen_task": (lambda: db.reopen_task(reopen_target), True),
+        "archive_all_completed": (lambda: db.archive_all_completed(), True),
+        "get_all_archived_tasks": (lambda: db.get_all_archived_tasks(), False),
+        "get_archived_page": (lambda: db.get_archived_page(after=page_cursor), False),
+        "get_tasks_for_report": (lambda: db.get_tasks_for_report(s_str, e_str), False),
+        "build_week_report": (lambda: build_week_report(week_rows, "This Week", today, True), False),
+        "build_project_report": (lambda: build_project_report(hierarchy, today, True), False),
+        "search": (lambda: db.search("deploy rev"), False),
+        "search_archived": (lambda: db.search("refac", status="ARCHIVED"), False),
+        "stream_week_report": (lambda: stream_report(week_report_lines(
+            db.iter_tasks_for_report(s_str, e_str, True), db.iter_tasks_for_report(s_str, e_str, False),
+            "This Week", today, True)), False),
+        "stream_project_report": (lambda: stream_report(project_report_lines(
+            db.iter_task_hierarchy(biggest), today, True)), False),
+    }
+
+
+def time_call(db, fn, writes, repeat):
+    # Best of N, in milliseconds
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if writes:
+            try:
+                with db.batch():
+                    fn()
+                    elapsed = time.perf_counter() - start
+                    raise _Undo()
+            except _Undo:
+                pass
+        else:
+            fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def run(args):
+    db, root_ids = build_synthetic_db(roots=args.roots, width=args.width, depth=args.depth,
+                                      archive_ratio=args.archive_ratio, note_size=args.note_size,
+                                      sessions=args.sessions, seed=args.seed)
+    try:
+        tasks = db.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        results = {name: time_call(db, fn, writes, args.repeat)
+                   for name, (fn, writes) in operations(db, root_ids).items()}
+    finally:
+        cleanup_db(db)
+    return {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "params": {"roots": args.roots, "width": args.width, "depth": args.depth, "tasks": tasks,
+                   "archive_ratio": args.archive_ratio, "note_size": args.note_size,
+                   "sessions": args.sessions, "seed": args.seed, "repeat": args.repeat},
+        "results_ms": results,
+    }
+
+
+# --- REGRESSION CHECK ---
+def compare(current, baseline, threshold, min_delta_ms):
+    # Operations that got slower than baseline * threshold, ignoring differences under min_delta_ms (timer noise)
+    regressions = []
+    for name, ms in current["results_ms"].items():
+        base = baseline.get("results_ms", {}).get(name)
+        if base is None: continue
+        if ms > base * threshold and ms - base > min_delta_ms:
+            regressions.append((name, base, ms))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the core database operations and report builders on a "
+                                                 "synthetic database.")
+    parser.add_argument("--roots", type=int, default=50, help="top-level projects")
+    parser.add_argument("--width", type=int, default=3, help="children per task")
+    parser.add_argument("--depth", type=int, default=4, help="levels per project, root included")
+    parser.add_argument("--archive-ratio", type=float, default=0.3)
+    parser.add_argument("--note-size", type=int, default=200, help="characters of notes per task")
+    parser.add_argument("--sessions", type=int, default=2, help="sessions per task")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown factor vs the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    current = run(args)
+    params = current["params"]
+    print(f"{params['tasks']} tasks ({args.roots} projects, width {args.width}, depth {args.depth}), "
+          f"best of {args.repeat}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params", {}).get("tasks") != params["tasks"]:
+            print("⚠️ Baseline was recorded on a different database size; comparing anyway.")
+
+    print(f"{'operation':<26} {'time':>10} {'baseline':>10}")
+    for name, ms in current["results_ms"].items():
+        base = baseline["results_ms"].get(name) if baseline else None
+        base_str = f"{base:>8.2f}ms" if base is not None else f"{'-':>10}"
+        print(f"{name:<26} {ms:>8.2f}ms {base_str}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"✅ Results written to '{args.output}'")
+
+    if baseline:
+        regressions = compare(current, baseline, args.threshold, args.min_delta_ms)
+        for name, base, ms in regressions:
+            print(f"❌ {name}: {base:.2f}ms -> {ms:.2f}ms ({ms / base:.2f}x, limit {args.threshold:.2f}x)")
+        if regressions:
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import argparse
+import sys
+import time
+
+from benchmarks.generators import SHAPES, build_tree_db, cleanup_db
+
+
+# --- LEGACY PATHS ---
+# The pre-CTE implementations (one query per node / two per ancestor level), kept here as the baseline.
+def legacy_get_task_hierarchy(db, task_id):
+    parent = db.get_task_by_id(task_id)
+    if not parent: return []
+    results = [dict(parent)]
+    for child in db.get_tasks(parent_id=task_id):
+        results.extend(legacy_get_task_hierarchy(db, child['id']))
+    return results
+
+
+def legacy_mark_children_status(db, parent_id, status, completed_at):
+    db.cursor.execute("SELECT id FROM tasks WHERE parent_id = ?", (parent_id,))
+    for child in db.cursor.fetchall():
+        db.cursor.execute("UPDATE tasks SET status = ?, completed_at = ? WHERE id = ?",
+                          (status, completed_at, child['id']))
+        legacy_mark_children_status(db, child['id'], status, completed_at)
+
+
+def legacy_propagate_time_upwards(db, parent_id, seconds_to_add):
+    curr_id = parent_id
+    while curr_id is not None:
+        db.cursor.execute("UPDATE tasks SET time_spent = time_spent + ? WHERE id = ?", (seconds_to_add, curr_id))
+        db.cursor.execute("SELECT parent_id FROM tasks WHERE id = ?", (curr_id,))
+        res = db.cursor.fetchone()
+        curr_id = res['parent_id'] if res else None
+
+
+def legacy_reopen_ancestors(db, task_id):
+    curr_id = task_id
+    while curr_id:
+        db.cursor.execute("SELECT parent_id FROM tasks WHERE id = ?", (curr_id,))
+        res = db.cursor.fetchone()
+        if res and res['parent_id']:
+            db.cursor.execute(
+                "UPDATE tasks SET status = 'NEW', completed_at = NULL WHERE id = ? AND status IN ('COMPLETED', 'ARCHIVED')",
+                (res['parent_id'],))
+            curr_id = res['parent_id']
+        else:
+            curr_id = None
+
+
+def cte_reopen_ancestors(db, task_id):
+    from database import ANCESTOR_IDS_SQL
+    db.cursor.execute(
+        f"""UPDATE tasks SET status = 'NEW', completed_at = NULL
+            WHERE status IN ('COMPLETED', 'ARCHIVED') AND id IN ({ANCESTOR_IDS_SQL})""",
+        (task_id,))
+
+
+def complete_ancestors(db, task_id):
+    # reopen_task finds the ancestors closed; on an all-NEW tree both reopen paths would update nothing
+    from database import ANCESTOR_IDS_SQL
+    db.cursor.execute(
+        f"UPDATE tasks SET status = 'COMPLETED', completed_at = '2025-01-01 00:00:00' WHERE id IN ({ANCESTOR_IDS_SQL})",
+        (task_id,))
+
+
+# --- RUNNER ---
+def operations(db, ids):
+    # name -> (legacy fn, cte fn[, untimed setup run before each call])
+    root, deepest = ids[0], ids[-1]
+    return {
+        "get_task_hierarchy": (
+            lambda: legacy_get_task_hierarchy(db, root),
+            lambda: db.get_task_hierarchy(root)),
+        "mark_children_status": (
+            lambda: legacy_mark_children_status(db, root, 'COMPLETED', '2025-01-01 00:00:00'),
+            lambda: db._mark_children_status(root, 'COMPLETED', '2025-01-01 00:00:00')),
+        # The CTE side is the app's real path: it also keeps own_seconds, in task_rollups rather than tasks
+        "propagate_time_upwards": (
+            lambda: legacy_propagate_time_upwards(db, deepest, 60),
+            lambda: db._rollup_add_seconds(deepest, 60)),
+        "reopen_ancestors": (
+            lambda: legacy_reopen_ancestors(db, deepest),
+            lambda: cte_reopen_ancestors(db, deepest),
+            lambda: complete_ancestors(db, deepest)),
+    }
+
+
+def time_call(db, fn, repeat, setup=None):
+    # Best of N; writes (the setup's included) are rolled back so every run sees the same tree
+    best = None
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        db.conn.rollback()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(nodes, repeat, shapes):
+    # The legacy hierarchy walk recurses once per level; give deep trees room
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), nodes * 4))
+    results = []
+    for shape in shapes:
+        db, ids = build_tree_db(shape, nodes)
+        try:
+            for name, (legacy_fn, cte_fn, *setup) in operations(db, ids).items():
+                legacy = time_call(db, legacy_fn, repeat, *setup)
+                cte = time_call(db, cte_fn, repeat, *setup)
+                results.append({"shape": shape, "op": name, "legacy_s": legacy, "cte_s": cte,
+                                "speedup": legacy / cte if cte else float("inf")})
+        finally:
+            cleanup_db(db)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare legacy per-node tree walks with the recursive-CTE versions.")
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    args = parser.parse_args(argv)
+
+    # Three decimals: the ancestor walks on wide/balanced trees take tens of microseconds
+    print(f"{'shape':<10} {'operation':<24} {'legacy':>11} {'cte':>11} {'speedup':>8}")
+    for r in run(args.nodes, args.repeat, args.shapes):
+        print(f"{r['shape']:<10} {r['op']:<24} {r['legacy_s'] * 1000:>9.3f}ms {r['cte_s'] * 1000:>9.3f}ms "
+              f"{r['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from database import TodoDatabase
+
+
+# --- SYNTHETIC TREE SHAPES ---
+# Each generator returns a list of parent indexes (None for the root), one per node.
+# Node i is always inserted after its parent, so ids line up with list positions.
+def wide_tree(n):
+    # One root with every other node as a direct child
+    return [None] + [0] * (n - 1)
+
+
+def deep_tree(n):
+    # A single chain: every node is the parent of the next
+    return [None] + list(range(n - 1))
+
+
+def balanced_tree(n, fanout=4):
+    return [None] + [(i - 1) // fanout for i in range(1, n)]
+
+
+SHAPES = {
+    "wide": wide_tree,
+    "deep": deep_tree,
+    "balanced": balanced_tree,
+}
+
+
+def build_tree_db(shape, n, db_path=None):
+    # Bulk-loads a tree straight into the tasks table (add_task would commit once per node).
+    # Returns (db, ids) where ids[i] is the task id of node i.
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(suffix=".db", prefix=f"bench_{shape}_")
+        os.close(fd)
+    db = TodoDatabase(db_path)
+    parents = SHAPES[shape](n)
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    db.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tasks")
+    first_id = db.cursor.fetchone()[0] + 1
+    ids = [first_id + i for i in range(n)]
+    db.cursor.executemany(
+        """INSERT INTO tasks (id, parent_id, task_name, category, created_at, status, time_spent)
+           VALUES (?, ?, ?, 'Work', ?, 'NEW', 0)""",
+        [(ids[i], ids[p] if p is not None else None, f"{shape}_{i}", created_at) for i, p in enumerate(parents)]
+    )
+    db.rebuild_rollups()  # bulk rows bypass the incremental rollup maintenance
+    return db, ids
+
+
+def build_synthetic_db(roots=50, width=3, depth=4, archive_ratio=0.3, note_size=200, sessions=2, seed=1,
+                       db_path=None):
+    # A realistic database built through the public API: `roots` top-level projects, each a tree where every
+    # node has `width` children down to `depth` levels. Every task gets `note_size` characters of notes and
+    # `sessions` tracked sessions spread over the last 30 days. Of the projects, `archive_ratio` are completed
+    # and archived, and as many again are completed but left in place for archive_all_completed.
+    # Returns (db, root_ids).
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(suffix=".db", prefix="bench_synthetic_")
+        os.close(fd)
+    rng = random.Random(seed)
+    db = TodoDatabase(db_path)
+    now = datetime.now()
+    words = ["refactor", "review", "deploy", "fix", "write", "test", "plan", "call", "design", "ship"]
+    categories = ["Work", "Work", "Work", "Personal", "Learning"]
+
+    def note():
+        if not note_size: return ""
+        text = " ".join(rng.choice(words) for _ in range(note_size // 6 + 1))
+        return text[:note_size]
+
+    root_ids, all_ids = [], []
+    with db.batch():
+        for r in range(roots):
+            category = rng.choice(categories)
+            root_id = db.add_task(f"Project {r}", category=category)
+            root_ids.append(root_id)
+            level = [root_id]
+            all_ids.append(root_id)
+            for d in range(1, depth):
+                next_level = []
+                for parent_id in level:
+                    for c in range(width):
+                        task_id = db.add_task(f"{rng.choice(words).title()} {r}.{d}.{c}", category=category,
+                                              parent_id=parent_id)
+                        next_level.append(task_id)
+                level = next_level
+                all_ids.extend(level)
+
+        for task_id in all_ids:
+            text = note()
+            if text: db.update_task_notes(task_id, text)
+
+        rows = []
+        for task_id in all_ids:
+            for _ in range(sessions):
+                start = now - timedelta(days=rng.uniform(0, 30))
+                seconds = rng.randint(60, 3 * 3600)
+                rows.append((task_id, start.strftime("%Y-%m-%d %H:%M:%S"),
+                             (start + timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S"), seconds))
+        db.cursor.executemany(
+            "INSERT INTO sessions (task_id, start_time, end_time, duration_seconds) VALUES (?, ?, ?, ?)", rows)
+
+    # Raw session rows bypass the incremental rollups and buckets
+    db.rebuild_rollups()
+    db.rebuild_time_buckets()
+
+    finished = rng.sample(root_ids, min(len(root_ids), int(len(root_ids) * archive_ratio) * 2))
+    with db.batch():
+        for i, root_id in enumerate(finished):
+            db.mark_completed(root_id)
+            if i % 2 == 0:
+                db.archive_task(root_id)
+    return db, root_ids
+
+
+def cleanup_db(db):
+    # Every attached file goes too (the main database and its cold archive tier)
+    paths = [row[2] for row in db.conn.execute("PRAGMA database_list") if row[2]]
+    db.close()
+    for path in paths:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+import threading
+
+from database import TodoDatabase
+from db_worker import DatabaseWorker
+
+
+# Runs a real DatabaseWorker against a throwaway WAL database and asserts how grouped writes behave.
+# The write lane is held on a gate job while a check queues its jobs, so they all run as one batch.
+
+class _Scheduler:
+    # Just enough of TickScheduler for the worker; results are collected with poll() instead
+    def every(self, *args, **kwargs):
+        pass
+
+    def cancel(self, name):
+        pass
+
+
+def _failing_job(db):
+    db.add_task("written, then taken back")
+    raise ValueError("job failed after writing")
+
+
+def check_failed_job_is_isolated(db, worker):
+    # One job raises after writing, another fails inside a mutator; the others' rows must still commit
+    gate = threading.Event()
+    worker.submit_write(gate.wait)
+    first = worker.submit_write(db.add_task, "first")
+    failing = worker.submit_write(_failing_job, db)
+    bad_insert = worker.submit_write(db.add_task, None)
+    third = worker.submit_write(db.add_task, "third")
+    gate.set()
+
+    problems = []
+    first_id, third_id = first.result(timeout=5), third.result(timeout=5)
+    if failing.exception(timeout=5) is None: problems.append("the failing job's future resolved as a success")
+    if bad_insert.result(timeout=5) is not None: problems.append("add_task(None) returned an id")
+    rows = {r["id"]: r["task_name"] for r in db.conn.execute("SELECT id, task_name FROM tasks")}
+    if rows.get(first_id) != "first": problems.append(f"'first' (id {first_id}) was lost: {rows}")
+    if rows.get(third_id) != "third": problems.append(f"'third' (id {third_id}) was lost: {rows}")
+    if "written, then taken back" in rows.values(): problems.append("the failing job's write was committed")
+    return problems
+
+
+def check_tier_moves_run_unbatched(db, worker):
+    # A cold tree moves back through an unbatched job; inside a batch the move is refused, not half-done
+    root = worker.submit_write(db.add_task, "old project").result(timeout=5)
+    child = worker.submit_write(db.add_task, "old subtask", None, "Work", root).result(timeout=5)
+    worker.submit_write(db.archive_task, root).result(timeout=5)
+    db.conn.execute("UPDATE tasks SET created_at = '2000-01-01 00:00:00' WHERE id IN (?, ?)", (root, child))
+    db.conn.commit()
+    worker.submit_write(db.compact_archive, 30, batch=False).result(timeout=5)
+
+    def tier(task_id):
+        for name in ("main", "cold"):
+            if db.conn.execute(f"SELECT 1 FROM {name}.tasks WHERE id = ?", (task_id,)).fetchone(): return name
+
+    problems = []
+    if tier(root) != "cold": problems.append(f"compact_archive left the tree in {tier(root)}")
+    gate = threading.Event()
+    worker.submit_write(gate.wait)
+    other = worker.submit_write(db.add_task, "batched alongside")
+    worker.submit_write(db.reopen_task, child)
+    gate.set()
+    other_id = other.result(timeout=5)
+    if tier(child) != "cold": problems.append("a batched reopen moved the tree")
+    if tier(other_id) != "main": problems.append("the refused move rolled back the rest of its batch")
+
+    worker.submit_write(db.reopen_task, child, batch=False).result(timeout=5)
+    if (tier(root), tier(child)) != ("main", "main"): problems.append("unbatched reopen didn't restore the tree")
+    return problems
+
+
+CHECKS = [
+    ("failed write job only undoes its own writes", check_failed_job_is_isolated),
+    ("archive tier moves run outside batches", check_tier_moves_run_unbatched),
+]
+
+
+def run_checks():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TodoDatabase(os.path.join(tmp, "check.db"))
+        worker = DatabaseWorker(db, _Scheduler())
+        try:
+            for name, check in CHECKS:
+                problems = check(db, worker)
+                if problems:
+                    failures += 1
+                    print(f"❌ {name}")
+                    for p in problems: print(f"   {p}")
+                else:
+                    print(f"✅ {name}")
+        finally:
+            if worker.shutdown(): db.close()
+    return failures
+
+
+if __name__ == "__main__":
+    # Run after changing db_worker.py or the batch/savepoint handling in database.py: python3 check_db_worker.py
+    sys.exit(1 if run_checks() else 0)
@@ -0,0 +1,104 @@
+import sys
+
+from database import TodoDatabase
+
+# Each check runs a real TodoDatabase method, captures the SQL it sends and asserts the query plan.
+# "uses": index names that must appear in the plan.
+# "scans": tables that may be full-scanned (anything else showing "SCAN <table>" fails the check).
+CHECKS = [
+    {"name": "get_tasks (children of a parent)",
+     "call": lambda db: db.get_tasks(parent_id=1),
+     "uses": {"idx_tasks_parent_status"}, "scans": set()},
+    {"name": "load_forest (active tree)",
+     "call": lambda db: db.load_forest(categories=["Work", "Personal"]),
+     "uses": {"idx_tasks_parent_status"}, "scans": {"f"}},  # f = the CTE work queue
+    {"name": "get_task_hierarchy",
+     "call": lambda db: db.get_task_hierarchy(1),
+     "uses": {"idx_tasks_parent_status"}, "scans": {"sub"}},
+    {"name": "get_all_archived_tasks",
+     "call": lambda db: db.get_all_archived_tasks(min_date="2024-01-01 00:00:00"),
+     "uses": {"idx_tasks_status_completed"}, "scans": set()},
+    {"name": "get_archived_page (keyset page)",
+     "call": lambda db: db.get_archived_page(min_date="2024-01-01 00:00:00", after=("2024-06-01 00:00:00", 10)),
+     "uses": {"idx_tasks_status_completed"}, "scans": {"(subquery-1)", "(subquery-3)"}},  # the per-tier pages
+    {"name": "archive_all_completed",
+     "call": lambda db: db.archive_all_completed(),
+     "uses": {"idx_tasks_status_completed"}, "scans": set()},
+    {"name": "get_tasks_for_report (daily buckets)",
+     "call": lambda db: db.get_tasks_for_report("2024-01-01 00:00:00", "2024-01-07 23:59:59"),
+     "uses": {"task_time_buckets USING PRIMARY KEY", "idx_tasks_completed", "idx_tasks_created"},
+     "scans": set()},
+    {"name": "iter_tasks_for_report (completed section)",
+     "call": lambda db: list(db.iter_tasks_for_report("2024-01-01 00:00:00", "2024-01-07 23:59:59", True)),
+     "uses": {"task_time_buckets USING PRIMARY KEY", "idx_tasks_completed", "idx_tasks_created"},
+     "scans": set()},
+    {"name": "iter_task_hierarchy (streamed project report)",
+     "call": lambda db: list(db.iter_task_hierarchy(1)),
+     "uses": {"idx_tasks_parent_status"}, "scans": {"tree"}},
+    {"name": "get_task_time_series (one task)",
+     "call": lambda db: db.get_task_time_series("day", "2024-01-01", "2024-12-31", task_id=1),
+     "uses": {"task_time_buckets USING"}, "scans": set()},
+    {"name": "get_distance_at (odometer seek)",
+     "call": lambda db: db.get_distance_at("2024-01-01 12:00:00"),
+     "uses": {"idx_distance_ledger_created"}, "scans": set()},
+    {"name": "get_category_time_series",
+     "call": lambda db: db.get_category_time_series("week", "2024-W01", "2024-W52"),
+     "uses": {"category_time_buckets USING PRIMARY KEY"}, "scans": set()},
+]
+
+
+def seed(db):
+    root = db.add_task("root")
+    child = db.add_task("child", parent_id=root)
+    db.start_timer(child)
+    db.stop_timer(child)
+    db.mark_completed(child)
+
+
+def capture_statements(db, call):
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        call(db)
+    finally:
+        db.conn.set_trace_callback(None)
+    keywords = ("SELECT", "UPDATE", "DELETE", "WITH", "INSERT")
+    return [s for s in statements if s.strip().upper().startswith(keywords)]
+
+
+def plan_for(db, sql):
+    rows = db.conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return [row[3] for row in rows]
+
+
+def run_checks():
+    db = TodoDatabase(":memory:")
+    seed(db)
+    failures = 0
+    for check in CHECKS:
+        plan_lines = []
+        for sql in capture_statements(db, check["call"]):
+            plan_lines.extend(plan_for(db, sql))
+        plan_text = "\n".join(plan_lines)
+
+        problems = [f"missing index {idx}" for idx in sorted(check["uses"]) if idx not in plan_text]
+        for line in plan_lines:
+            if line.startswith("SCAN ") and "USING" not in line:
+                table = line.split()[1]
+                if table not in check["scans"]:
+                    problems.append(f"full scan: {line}")
+
+        if problems:
+            failures += 1
+            print(f"❌ {check['name']}")
+            for p in problems: print(f"   {p}")
+            for line in plan_lines: print(f"      | {line}")
+        else:
+            print(f"✅ {check['name']}")
+    db.close()
+    return failures
+
+
+if __name__ == "__main__":
+    # Run before changing any hot query: python3 check_query_plans.py
+    sys.exit(1 if run_checks() else 0)
@@ -1,16 +1,387 @@
+import functools
+import queue
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# --- TREE QUERIES ---
+# Set-based tree walks: one statement per operation instead of one per node/level.
+# Both select ids from a single "?" anchor and are meant to be used as sub-selects.
+TIER_DESCENDANT_IDS_SQL = """
+    WITH RECURSIVE sub(id) AS (
+        SELECT id FROM {tier}.tasks WHERE parent_id = ?
+        UNION ALL
+        SELECT t.id FROM {tier}.tasks t JOIN sub ON t.parent_id = sub.id
+    )
+    SELECT id FROM sub
+"""
+DESCENDANT_IDS_SQL = TIER_DESCENDANT_IDS_SQL.format(tier="main")
+
+OPEN_STATUSES = ('NEW', 'IN_PROGRESS')  # everything else counts as completed in the rollups
+
+# Task rows as the UI sees them: base columns plus the materialized subtree rollup (see task_rollups)
+TASK_SELECT_SQL = """
+    t.*, COALESCE(r.own_seconds, t.time_spent) AS own_seconds,
+    COALESCE(r.subtree_seconds, t.time_spent) AS subtree_seconds,
+    COALESCE(r.open_descendants, 0) AS open_descendants,
+    COALESCE(r.completed_descendants, 0) AS completed_descendants
+"""
+ROLLUP_JOIN_SQL = "LEFT JOIN task_rollups r ON r.task_id = t.id"
+
+# --- ARCHIVE TIERS ---
+# Archived trees past a cutoff move, whole, into an attached "cold" database holding the same tables. Whole
+# trees move, so parent / rollup / note joins never cross tiers: a cross-tier read runs one query per schema
+# ({tier} = main / cold) joined with UNION ALL.
+TIERS = ("main", "cold")
+TIER_TABLES = (("tasks", "id"), ("sessions", "task_id"), ("task_notes", "task_id"), ("task_rollups", "task_id"))
+TIER_ROLLUP_JOIN_SQL = "LEFT JOIN {tier}.task_rollups r ON r.task_id = t.id"
+TIER_NOTES_JOIN_SQL = "LEFT JOIN {tier}.task_notes n ON n.task_id = t.id"
+
+
+def cold_db_name(db_name):
+    # todo.db -> todo_cold.db, next to it
+    if db_name == ":memory:": return db_name
+    path = Path(db_name)
+    return str(path.with_name(f"{path.stem}_cold{path.suffix or '.db'}"))
+
+# --- REPORTS ---
+# Tasks that belong in a date-range report: completed or created in the range, or tracked in it (daily buckets).
+# period_seconds is the time tracked on the task inside the range. The buckets stay in the main database for
+# every tier; the task arm runs once per tier ({extra} adds filters to each arm). Params: _report_params.
+# The three ways in are separate index lookups (idx_tasks_completed, idx_tasks_created, the buckets' primary
+# key) unioned into a set of ids, rather than one OR that can only be answered by scanning tasks.
+REPORT_TRACKED_SQL = """
+    WITH tracked AS (
+        SELECT task_id, SUM(seconds) AS period_seconds FROM main.task_time_buckets
+        WHERE grain = 'day' AND period BETWEEN ? AND ?
+        GROUP BY task_id
+    )
+"""
+REPORT_TASKS_ARM_SQL = """
+    SELECT 
+        t.*, 
+        p.task_name as parent_name,
+        COALESCE(tr.period_seconds, 0) AS period_seconds
+    FROM {tier}.tasks t
+    LEFT JOIN {tier}.tasks p ON t.parent_id = p.id
+    LEFT JOIN tracked tr ON tr.task_id = t.id
+    WHERE 
+        t.id IN (
+            SELECT id FROM {tier}.tasks WHERE completed_at BETWEEN ? AND ?
+            UNION
+            SELECT id FROM {tier}.tasks WHERE created_at BETWEEN ? AND ?
+            UNION
+            SELECT task_id FROM main.task_time_buckets WHERE grain = 'day' AND period BETWEEN ? AND ?
+        )
+        AND t.category != 'Personal'{extra}
+"""
+STREAM_FETCH_ROWS = 500  # rows per fetchmany() in the streaming readers
+
+
+def _report_params(start_date_str, end_date_str, tiers):
+    days = (start_date_str[:10], end_date_str[:10])
+    return days + (start_date_str, end_date_str, start_date_str, end_date_str, *days) * len(tiers)
+
+
+# --- FULL-TEXT SEARCH ---
+# unicode61 with diacritics folded, so "resume" finds "résumé"; 2/3-character prefix indexes keep the
+# as-you-type prefix queries cheap
+SEARCH_FTS_COLUMNS = "task_name, notes, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+# Triggers keep task names in the index; note bodies are indexed by update_task_notes (they live in task_notes)
+SEARCH_TRIGGERS_SQL = (
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+           INSERT INTO tasks_fts (rowid, task_name, notes) VALUES (new.id, new.task_name, '');
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF task_name ON tasks BEGIN
+           UPDATE tasks_fts SET task_name = new.task_name WHERE rowid = new.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+           DELETE FROM tasks_fts WHERE rowid = old.id;
+       END""",
+)
+SEARCH_WORD_RE = re.compile(r"\w+")
+SEARCH_RANK_WINDOW = 1000  # bm25 ranks at most this many of the newest matches (ranking is O(matches))
+
+
+# --- NOTES STORAGE ---
+# Note bodies live out of row in task_notes, so list queries never page them in; tasks only carries
+# has_notes / notes_len. Bodies of NOTES_COMPRESS_MIN bytes or more are zlib-compressed when that saves space.
+# note_text(compressed, body) is registered on every connection, so SQL can read bodies directly.
+NOTES_COMPRESS_MIN = 512
+NOTES_JOIN_SQL = "LEFT JOIN task_notes n ON n.task_id = t.id"
+NOTES_SELECT_SQL = "COALESCE(note_text(n.compressed, n.body), '') AS notes"
+
+
+def encode_note(text):
+    # -> (compressed, body) as stored in task_notes
+    raw = text.encode("utf-8")
+    if len(raw) >= NOTES_COMPRESS_MIN:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return 1, packed
+    return 0, raw
+
+
+def decode_note(compressed, body):
+    if body is None: return None
+    return (zlib.decompress(body) if compressed else bytes(body)).decode("utf-8")
+
+
+# --- TIME-SERIES BUCKETS ---
+# Tracked time is pre-aggregated per task and per category into day ('2025-01-31') and ISO week ('2025-W05')
+# periods, so range queries read a few bucket rows instead of every raw session.
+BUCKET_GRAINS = ("day", "week")
+
+
+def time_bucket_period(grain, dt):
+    if grain == "day":
+        return dt.strftime("%Y-%m-%d")
+    iso_year, iso_week, _ = dt.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+def time_buckets(start_dt, seconds):
+    # Splits one session at midnight into {(grain, period): seconds}; a session crossing a day (or week)
+    # boundary is credited to both sides
+    buckets = {}
+    end_dt = start_dt + timedelta(seconds=seconds)
+    cursor = start_dt
+    while cursor < end_dt:
+        next_midnight = datetime.combine(cursor.date() + timedelta(days=1), datetime.min.time())
+        chunk_end = min(next_midnight, end_dt)
+        chunk = int((chunk_end - cursor).total_seconds())
+        for grain in BUCKET_GRAINS:
+            key = (grain, time_bucket_period(grain, cursor))
+            buckets[key] = buckets.get(key, 0) + chunk
+        cursor = chunk_end
+    return buckets
+
+
+ANCESTOR_IDS_SQL = """
+    WITH RECURSIVE anc(id) AS (
+        SELECT parent_id FROM tasks WHERE id = ? AND parent_id IS NOT NULL
+        UNION ALL
+        SELECT t.parent_id FROM tasks t JOIN anc ON t.id = anc.id WHERE t.parent_id IS NOT NULL
+    )
+    SELECT id FROM anc
+"""
+# The task itself plus its ancestors, one primary-key lookup per level. Cheaper than "id = ? OR id IN
+# (ANCESTOR_IDS_SQL)", which SQLite answers with two index passes.
+ANCESTOR_PATH_SQL = """
+    WITH RECURSIVE path(id, parent_id) AS (
+        SELECT id, parent_id FROM tasks WHERE id = ?
+        UNION ALL
+        SELECT t.id, t.parent_id FROM tasks t JOIN path ON t.id = path.parent_id
+    )
+    SELECT id FROM path
+"""
+
+# --- STORAGE PROFILES ---
+# PRAGMA sets applied to every connection. "performance" is the default: WAL lets readers run while a write
+# is pending, and synchronous=NORMAL only fsyncs at checkpoints (a crash can lose the last commit, never corrupt).
+STORAGE_PROFILES = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,  # KiB (negative = size, not pages)
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+
+
+class ConnectionManager:
+    """Owns the SQLite connections for one database file.
+
+    A single writer connection handles every mutation. Read-only connections are pooled and handed out with
+    reader(), so report generation and tree loading never queue behind a pending write (WAL only; other
+    journal modes, and in-memory databases, read through the writer).
+    """
+
+    def __init__(self, db_name, profile="performance", pool_size=2, cold_name=None):
+        self.db_name = db_name
+        self.cold_name = cold_name or cold_db_name(db_name)
+        self.pragmas = STORAGE_PROFILES[profile]
+        self.pool_size = pool_size
+        self.writer = self._open(db_name)
+        self._apply_pragmas(self.writer, include_journal=True)
+        # The archive's cold tier (see TIERS); created on first open
+        self.writer.execute("ATTACH DATABASE ? AS cold", (self.cold_name,))
+        if "journal_mode" in self.pragmas:
+            self.writer.execute(f"PRAGMA cold.journal_mode = {self.pragmas['journal_mode']}")
+
+        journal_mode = self.writer.execute("PRAGMA journal_mode").fetchone()[0]
+        self.pooled = journal_mode.lower() == "wal" and db_name != ":memory:"
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self, target, uri=False):
+        conn = sqlite3.connect(target, uri=uri, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.create_function("note_text", 2, decode_note, deterministic=True)
+        return conn
+
+    def _apply_pragmas(self, conn, include_journal=False):
+        for name, value in self.pragmas.items():
+            if name == "journal_mode" and not include_journal: continue
+            conn.execute(f"PRAGMA {name} = {value}")
+
+    def _open_reader(self):
+        uri = f"{Path(self.db_name).resolve().as_uri()}?mode=ro"
+        conn = self._open(uri, uri=True)
+        self._apply_pragmas(conn)
+        conn.execute("ATTACH DATABASE ? AS cold", (f"{Path(self.cold_name).resolve().as_uri()}?mode=ro",))
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        if not self.pooled:
+            yield self.writer
+            return
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.pool_size
+                if can_open: self._opened += 1
+            conn = self._open_reader() if can_open else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self.writer.close()
+
+
+def _isolated(method):
+    # Mutators run in their own savepoint when called inside batch(), so a failing one only undoes its own writes
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.savepoint():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class TodoDatabase:
-    def __init__(self, db_name="todo.db"):
-        self.conn = sqlite3.connect(db_name)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self, db_name="todo.db", profile="performance", cold_name=None):
+        self.connections = ConnectionManager(db_name, profile, cold_name=cold_name)
+        self.conn = self.connections.writer
         self.cursor = self.conn.cursor()
+        self._batch_depth = 0
+        self._savepoints = []  # open savepoint names, innermost last (see savepoint())
+        self._writer_thread = threading.get_ident()
         # Initialize tables safely
         self.create_table()
         self._migrate_notes_column()
         self._init_stats_table()
+        self.tiers = ("main",)  # cross-tier reads only include the cold tier once its tables exist
+        self._apply_migrations()
+        self.search_enabled = self._has_search_index(self.cursor)
+        self._init_cold_tier()
+
+    def bind_writer_thread(self):
+        # The thread that issues writes (see db_worker.DatabaseWorker); reads from it may use the writer
+        self._writer_thread = threading.get_ident()
+
+    @contextmanager
+    def _read(self):
+        # Pooled read-only cursor. While the writer thread has uncommitted changes it reads through the
+        # writer instead, so it always sees its own writes; other threads only ever see committed data.
+        if self.conn.in_transaction and threading.get_ident() == self._writer_thread:
+            yield self.conn.cursor()
+            return
+        with self.connections.reader() as conn:
+            yield conn.cursor()
+
+    # --- GROUP COMMIT ---
+    @contextmanager
+    def batch(self):
+        """Group every mutation made inside the block into a single transaction (one fsync).
+
+        Nestable; only the outermost block commits. Mutators called inside defer their commit to the
+        end of the block, and an exception escaping the block rolls all of it back. A mutator that fails
+        inside the block only undoes its own writes (see savepoint()); the rest of the group still commits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.rollback()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
+    @contextmanager
+    def savepoint(self):
+        # Inside a batch, makes the block atomic on its own: an exception (or a mutator's _rollback) undoes the
+        # block's writes and nothing else. Outside a batch mutators commit or roll back by themselves.
+        if not self._batch_depth:
+            yield
+            return
+        name = f"sp{len(self._savepoints)}"
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")  # else releasing the outermost savepoint would commit the batch early
+        self.conn.execute(f"SAVEPOINT {name}")
+        self._savepoints.append(name)
+        try:
+            yield
+        except BaseException:
+            self._rollback()
+            raise
+        finally:
+            self._savepoints.pop()
+            if self.conn.in_transaction:
+                self.conn.execute(f"RELEASE {name}")
+
+    def _commit(self):
+        # Mutators call this instead of conn.commit() so batch() can coalesce them
+        if self._batch_depth: return
+        self.conn.commit()
+
+    def _rollback(self):
+        # Mutators call this instead of conn.rollback(): inside a batch only their savepoint is undone, never
+        # the writes other callers in the group were already told succeeded
+        if not self._batch_depth:
+            self.conn.rollback()
+        elif self._savepoints and self.conn.in_transaction:
+            self.conn.execute(f"ROLLBACK TO {self._savepoints[-1]}")
+
+    def flush(self):
+        # Commits whatever is pending on the writer; False if that commit failed (and was rolled back)
+        try:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"DB Error (flush): {e}")
+            self.conn.rollback()
+            return False
 
     def create_table(self):
         try:
@@ -51,13 +422,359 @@ class TodoDatabase:
         try:
             self.cursor.execute("PRAGMA table_info(tasks)")
             columns = [info[1] for info in self.cursor.fetchall()]
-            if "notes" not in columns:
+            # has_notes means the notes already moved to task_notes (migration 6)
+            if "notes" not in columns and "has_notes" not in columns:
                 self.cursor.execute("ALTER TABLE tasks ADD COLUMN notes TEXT DEFAULT ''")
                 self.conn.commit()
         except sqlite3.Error as e:
             print(f"DB Error (migrate_notes): {e}")
             self.conn.rollback()
 
+    # --- VERSIONED MIGRATIONS ---
+    def _apply_migrations(self):
+        # Each step runs once, in order, inside its own transaction; PRAGMA user_version records the last one applied
+        migrations = [
+            (1, self._migration_add_indexes),
+            (2, self._migration_add_rollups),
+            (3, self._migration_add_time_buckets),
+            (4, self._migration_add_distance_ledger),
+            (5, self._migration_add_search_index),
+            (6, self._migration_move_notes_out_of_row),
+            (7, self._migration_add_report_indexes),
+        ]
+        try:
+            self.cursor.execute("PRAGMA user_version")
+            current_version = self.cursor.fetchone()[0]
+            for version, migrate in migrations:
+                if version <= current_version: continue
+                self.cursor.execute("BEGIN")
+                migrate()
+                self.cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"DB Error (migrations): {e}")
+            self.conn.rollback()
+
+    def _migration_add_indexes(self):
+        # Hot paths: tree loads / get_tasks (parent_id), archive tab + flush (status, completed_at),
+        # per-task session lookups in reports (task_id, start_time)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_parent_status ON tasks(parent_id, status)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_completed ON tasks(status, completed_at)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_task_start ON sessions(task_id, start_time)")
+
+    def _migration_add_rollups(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_rollups (
+                task_id INTEGER PRIMARY KEY,
+                own_seconds INTEGER DEFAULT 0,
+                subtree_seconds INTEGER DEFAULT 0,
+                open_descendants INTEGER DEFAULT 0,
+                completed_descendants INTEGER DEFAULT 0,
+                FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+            )
+        """)
+        self._rebuild_rollups()
+
+    def _migration_add_time_buckets(self):
+        # Keyed (grain, period, ...) so a date range is one primary-key range scan. No FK cascade: deletes
+        # take their time back out explicitly (see _buckets_remove_subtree) so category totals stay in step.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_time_buckets (
+                grain TEXT NOT NULL,
+                period TEXT NOT NULL,
+                task_id INTEGER NOT NULL,
+                seconds INTEGER DEFAULT 0,
+                PRIMARY KEY (grain, period, task_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS category_time_buckets (
+                grain TEXT NOT NULL,
+                period TEXT NOT NULL,
+                category TEXT NOT NULL,
+                seconds INTEGER DEFAULT 0,
+                PRIMARY KEY (grain, period, category)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_task_time_buckets_task ON task_time_buckets(task_id, grain, period)")
+        self._rebuild_time_buckets()
+
+    def _migration_add_distance_ledger(self):
+        # Append-only odometer history. No FK cascade: distance already travelled stays on the books when a
+        # task is deleted. running_total is the odometer right after the entry, so "distance at time T" is one
+        # index seek on created_at.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS distance_ledger (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                kind TEXT NOT NULL DEFAULT 'gain',
+                km INTEGER NOT NULL,
+                running_total INTEGER NOT NULL,
+                task_id INTEGER,
+                session_id INTEGER
+            )
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_distance_ledger_created ON distance_ledger(created_at)")
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_distance (
+                task_id INTEGER PRIMARY KEY,
+                km INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # Opening checkpoint: whatever the odometer read before the ledger existed
+        self.cursor.execute("SELECT value FROM user_stats WHERE key = 'total_distance'")
+        row = self.cursor.fetchone()
+        opening_km = row['value'] if row else 0
+        self.cursor.execute(
+            "INSERT INTO distance_ledger (created_at, kind, km, running_total) VALUES (?, 'checkpoint', ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), opening_km, opening_km))
+
+    def _migration_add_search_index(self):
+        # Skipped on SQLite builds without FTS5; search() then falls back to LIKE.
+        # Indexes tasks.notes as it was at this version; migration 6 moves notes out and swaps the triggers.
+        try:
+            self.cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5({SEARCH_FTS_COLUMNS})")
+        except sqlite3.OperationalError as e:
+            print(f"DB Warning (search index unavailable): {e}")
+            return
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts (rowid, task_name, notes) VALUES (new.id, new.task_name, COALESCE(new.notes, ''));
+            END""")
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF task_name, notes ON tasks BEGIN
+                UPDATE tasks_fts SET task_name = new.task_name, notes = COALESCE(new.notes, '') WHERE rowid = new.id;
+            END""")
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                DELETE FROM tasks_fts WHERE rowid = old.id;
+            END""")
+        self.cursor.execute("INSERT INTO tasks_fts (rowid, task_name, notes) "
+                            "SELECT id, task_name, COALESCE(notes, '') FROM tasks")
+
+    def _migration_move_notes_out_of_row(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_notes (
+                task_id INTEGER PRIMARY KEY,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                body BLOB NOT NULL,
+                FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+            )
+        """)
+        self.cursor.execute("PRAGMA table_info(tasks)")
+        columns = [info[1] for info in self.cursor.fetchall()]
+        if "has_notes" not in columns:
+            self.cursor.execute("ALTER TABLE tasks ADD COLUMN has_notes INTEGER DEFAULT 0")
+            self.cursor.execute("ALTER TABLE tasks ADD COLUMN notes_len INTEGER DEFAULT 0")
+        if "notes" in columns:
+            # The v5 search triggers name tasks.notes, which blocks DROP COLUMN; the FTS rows keep their text
+            self.cursor.execute("DROP TRIGGER IF EXISTS tasks_fts_insert")
+            self.cursor.execute("DROP TRIGGER IF EXISTS tasks_fts_update")
+            for row in self.conn.execute("SELECT id, notes FROM tasks WHERE notes IS NOT NULL AND notes != ''"):
+                self._store_note(row['id'], row['notes'])
+            self.cursor.execute("ALTER TABLE tasks DROP COLUMN notes")
+        if self._has_search_index(self.cursor):
+            for trigger in SEARCH_TRIGGERS_SQL:
+                self.cursor.execute(trigger)
+
+    def _migration_add_report_indexes(self):
+        # Date-range reports look tasks up by completed_at and by created_at (see REPORT_TASKS_ARM_SQL).
+        # category stays out of the key: the reports filter it with !=, which an index can't seek on.
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed_at)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at)")
+
+    # --- SUBTREE ROLLUPS ---
+    # task_rollups keeps, per task: its own tracked seconds, the seconds of its whole subtree, and how many
+    # descendants are open / completed. Mutators update it incrementally inside their own transaction;
+    # rebuild_rollups() recomputes everything from tasks + sessions.
+    def _rollup_insert(self, task_id):
+        # New tasks start open with no time: one more open descendant for every ancestor
+        self.cursor.execute("INSERT OR IGNORE INTO task_rollups (task_id) VALUES (?)", (task_id,))
+        self.cursor.execute(
+            f"UPDATE task_rollups SET open_descendants = open_descendants + 1 WHERE task_id IN ({ANCESTOR_IDS_SQL})",
+            (task_id,))
+
+    def _rollup_add_seconds(self, task_id, seconds):
+        # One statement for the task and its ancestors: on shallow trees the per-statement cost is most of it
+        self.cursor.execute(
+            f"""UPDATE task_rollups SET own_seconds = own_seconds + CASE WHEN task_id = ? THEN ? ELSE 0 END,
+                    subtree_seconds = subtree_seconds + ?
+                WHERE task_id IN ({ANCESTOR_PATH_SQL})""",
+            (task_id, seconds, seconds, task_id))
+
+    def _rollup_remove_subtree(self, task_id):
+        # Called before a delete: take the subtree's time and counts (the root included) off every ancestor.
+        # The subtree's own rollup rows go with the tasks (ON DELETE CASCADE).
+        self.cursor.execute(
+            f"""SELECT r.subtree_seconds, r.open_descendants, r.completed_descendants,
+                       t.status IN ({', '.join('?' * len(OPEN_STATUSES))}) AS is_open
+                FROM tasks t JOIN task_rollups r ON r.task_id = t.id WHERE t.id = ?""",
+            (*OPEN_STATUSES, task_id))
+        row = self.cursor.fetchone()
+        if not row: return
+        open_removed = row['open_descendants'] + (1 if row['is_open'] else 0)
+        completed_removed = row['completed_descendants'] + (0 if row['is_open'] else 1)
+        self.cursor.execute(
+            f"""UPDATE task_rollups SET subtree_seconds = subtree_seconds - ?,
+                    open_descendants = open_descendants - ?, completed_descendants = completed_descendants - ?
+                WHERE task_id IN ({ANCESTOR_IDS_SQL})""",
+            (row['subtree_seconds'], open_removed, completed_removed, task_id))
+
+    def _collect_status_flips(self, where_sql, params, to_open):
+        # Before a status change: remember which of the affected tasks will switch between open and completed
+        placeholders = ', '.join('?' * len(OPEN_STATUSES))
+        current = "IN" if not to_open else "NOT IN"
+        self.cursor.execute("CREATE TEMP TABLE IF NOT EXISTS rollup_flips (id INTEGER PRIMARY KEY)")
+        self.cursor.execute("DELETE FROM temp.rollup_flips")
+        self.cursor.execute(
+            f"""INSERT INTO temp.rollup_flips
+                SELECT id FROM tasks WHERE ({where_sql}) AND status {current} ({placeholders})""",
+            (*params, *OPEN_STATUSES))
+
+    def _apply_status_flips(self, to_open):
+        # After the status change: every ancestor of a flipped task moves one count per flipped descendant
+        self.cursor.execute("""
+            WITH RECURSIVE anc(id) AS (
+                SELECT t.parent_id FROM temp.rollup_flips f JOIN tasks t ON t.id = f.id
+                WHERE t.parent_id IS NOT NULL
+                UNION ALL
+                SELECT t.parent_id FROM anc JOIN tasks t ON t.id = anc.id WHERE t.parent_id IS NOT NULL
+            )
+            SELECT id, COUNT(*) AS n FROM anc GROUP BY id
+        """)
+        sign = 1 if to_open else -1
+        self.cursor.executemany(
+            """UPDATE task_rollups SET open_descendants = open_descendants + ?,
+                   completed_descendants = completed_descendants - ?
+               WHERE task_id = ?""",
+            [(sign * r['n'], sign * r['n'], r['id']) for r in self.cursor.fetchall()])
+        self.cursor.execute("DELETE FROM temp.rollup_flips")
+
+    def _rebuild_rollups(self):
+        # Full recompute from the source of truth: sessions for time, tasks for status and shape.
+        # time_spent is realigned to the task's own session time (older builds also added children's time).
+        self.cursor.execute("DELETE FROM task_rollups")
+        self.cursor.execute(f"""
+            INSERT INTO task_rollups (task_id, own_seconds, subtree_seconds, open_descendants, completed_descendants)
+            WITH RECURSIVE closure(anc, descendant) AS (
+                SELECT id, id FROM tasks
+                UNION ALL
+                SELECT c.anc, t.id FROM closure c JOIN tasks t ON t.parent_id = c.descendant
+            ),
+            own AS (SELECT task_id, SUM(duration_seconds) AS secs FROM sessions GROUP BY task_id)
+            SELECT c.anc,
+                   SUM(CASE WHEN c.descendant = c.anc THEN COALESCE(o.secs, 0) ELSE 0 END),
+                   SUM(COALESCE(o.secs, 0)),
+                   SUM(c.descendant != c.anc AND t.status IN ({', '.join(repr(s) for s in OPEN_STATUSES)})),
+                   SUM(c.descendant != c.anc AND t.status NOT IN ({', '.join(repr(s) for s in OPEN_STATUSES)}))
+            FROM closure c
+            JOIN tasks t ON t.id = c.descendant
+            LEFT JOIN own o ON o.task_id = c.descendant
+            GROUP BY c.anc
+        """)
+        self.cursor.execute("UPDATE tasks SET time_spent = (SELECT own_seconds FROM task_rollups WHERE task_id = id)")
+
+    @_isolated
+    def rebuild_rollups(self):
+        try:
+            self._rebuild_rollups()
+            self._commit()
+        except sqlite3.Error as e:
+            print(f"DB Error (rebuild_rollups): {e}")
+            self._rollback()
+
+    # --- TIME-SERIES BUCKETS ---
+    def _buckets_add_session(self, task_id, category, start_dt, seconds):
+        rows = time_buckets(start_dt, seconds)
+        self.cursor.executemany(
+            """INSERT INTO task_time_buckets (grain, period, task_id, seconds) VALUES (?, ?, ?, ?)
+               ON CONFLICT(grain, period, task_id) DO UPDATE SET seconds = seconds + excluded.seconds""",
+            [(grain, period, task_id, secs) for (grain, period), secs in rows.items()])
+        self.cursor.executemany(
+            """INSERT INTO category_time_buckets (grain, period, category, seconds) VALUES (?, ?, ?, ?)
+               ON CONFLICT(grain, period, category) DO UPDATE SET seconds = seconds + excluded.seconds""",
+            [(grain, period, category, secs) for (grain, period), secs in rows.items()])
+
+    def _buckets_remove_subtree(self, task_id):
+        # Called before a delete: the subtree's sessions go with it (ON DELETE CASCADE), so do its buckets
+        self.cursor.execute(f"""
+            SELECT b.grain, b.period, t.category, SUM(b.seconds) AS secs
+            FROM task_time_buckets b JOIN tasks t ON t.id = b.task_id
+            WHERE b.task_id = ? OR b.task_id IN ({DESCENDANT_IDS_SQL})
+            GROUP BY b.grain, b.period, t.category
+        """, (task_id, task_id))
+        self.cursor.executemany(
+            "UPDATE category_time_buckets SET seconds = seconds - ? WHERE grain = ? AND period = ? AND category = ?",
+            [(r['secs'], r['grain'], r['period'], r['category']) for r in self.cursor.fetchall()])
+        self.cursor.execute("DELETE FROM category_time_buckets WHERE seconds <= 0")
+        self.cursor.execute(
+            f"DELETE FROM task_time_buckets WHERE task_id = ? OR task_id IN ({DESCENDANT_IDS_SQL})",
+            (task_id, task_id))
+
+    def _rebuild_time_buckets(self):
+        self.cursor.execute("DELETE FROM task_time_buckets")
+        self.cursor.execute("DELETE FROM category_time_buckets")
+        self.cursor.execute(*self._tiered("""
+            SELECT s.task_id, t.category, s.start_time, s.duration_seconds
+            FROM {tier}.sessions s JOIN {tier}.tasks t ON t.id = s.task_id
+            WHERE s.duration_seconds > 0
+        """))
+        task_totals, category_totals = {}, {}
+        for row in self.cursor.fetchall():
+            start_dt = datetime.strptime(row['start_time'], "%Y-%m-%d %H:%M:%S")
+            for (grain, period), secs in time_buckets(start_dt, row['duration_seconds']).items():
+                task_key = (grain, period, row['task_id'])
+                category_key = (grain, period, row['category'])
+                task_totals[task_key] = task_totals.get(task_key, 0) + secs
+                category_totals[category_key] = category_totals.get(category_key, 0) + secs
+        self.cursor.executemany(
+            "INSERT INTO task_time_buckets (grain, period, task_id, seconds) VALUES (?, ?, ?, ?)",
+            [(*key, secs) for key, secs in task_totals.items()])
+        self.cursor.executemany(
+            "INSERT INTO category_time_buckets (grain, period, category, seconds) VALUES (?, ?, ?, ?)",
+            [(*key, secs) for key, secs in category_totals.items()])
+
+    @_isolated
+    def rebuild_time_buckets(self):
+        try:
+            self._rebuild_time_buckets()
+            self._commit()
+        except sqlite3.Error as e:
+            print(f"DB Error (rebuild_time_buckets): {e}")
+            self._rollback()
+
+    def get_task_time_series(self, grain, start_period, end_period, task_id=None):
+        # Seconds per task per period, e.g. get_task_time_series("day", "2025-01-01", "2025-01-31").
+        # Periods are inclusive and use time_bucket_period()'s format.
+        try:
+            query = """SELECT period, task_id, seconds FROM task_time_buckets
+                       WHERE grain = ? AND period BETWEEN ? AND ?"""
+            params = [grain, start_period, end_period]
+            if task_id is not None:
+                query += " AND task_id = ?"
+                params.append(task_id)
+            query += " ORDER BY period, task_id"
+            with self._read() as cur:
+                cur.execute(query, tuple(params))
+                return cur.fetchall()
+        except sqlite3.Error as e:
+            print(f"DB Error (get_task_time_series): {e}")
+            return []
+
+    def get_category_time_series(self, grain, start_period, end_period):
+        try:
+            with self._read() as cur:
+                cur.execute(
+                    """SELECT period, category, seconds FROM category_time_buckets
+                       WHERE grain = ? AND period BETWEEN ? AND ?
+                       ORDER BY period, category""",
+                    (grain, start_period, end_period))
+                return cur.fetchall()
+        except sqlite3.Error as e:
+            print(f"DB Error (get_category_time_series): {e}")
+            return []
+
     # --- NEW: STATS TABLE ---
     def _init_stats_table(self):
         try:
@@ -76,131 +793,652 @@ class TodoDatabase:
 
     def get_total_distance(self):
         try:
-            self.cursor.execute("SELECT value FROM user_stats WHERE key = 'total_distance'")
-            row = self.cursor.fetchone()
+            with self._read() as cur:
+                cur.execute("SELECT value FROM user_stats WHERE key = 'total_distance'")
+                row = cur.fetchone()
             return row['value'] if row else 0
         except sqlite3.Error as e:
             print(f"DB Error (get_distance): {e}")
             return 0
 
-    def add_distance(self, km_to_add):
+    @_isolated
+    def add_distance(self, km_to_add, task_id=None):
+        # total_distance is the cached sum of the ledger. A task's gain is linked to its latest session
+        # (the one stop_timer just closed when called from the same batch).
         try:
             self.cursor.execute("UPDATE user_stats SET value = value + ? WHERE key = 'total_distance'", (km_to_add,))
-            self.conn.commit()
+            self.cursor.execute(
+                """INSERT INTO distance_ledger (created_at, kind, km, running_total, task_id, session_id)
+                   VALUES (?, 'gain', ?, (SELECT value FROM user_stats WHERE key = 'total_distance'), ?,
+                           (SELECT MAX(id) FROM sessions WHERE task_id = ?))""",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), km_to_add, task_id, task_id))
+            if task_id is not None:
+                self.cursor.execute(
+                    """INSERT INTO task_distance (task_id, km) VALUES (?, ?)
+                       ON CONFLICT(task_id) DO UPDATE SET km = km + excluded.km""",
+                    (task_id, km_to_add))
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (add_distance): {e}")
+            self._rollback()
+
+    # --- DISTANCE LEDGER ---
+    def get_distance_at(self, timestamp_str):
+        # Odometer reading at a moment ("YYYY-MM-DD HH:MM:SS"): one seek on idx_distance_ledger_created
+        try:
+            with self._read() as cur:
+                cur.execute("""SELECT running_total FROM distance_ledger WHERE created_at <= ?
+                               ORDER BY created_at DESC, id DESC LIMIT 1""", (timestamp_str,))
+                row = cur.fetchone()
+            return row['running_total'] if row else 0
+        except sqlite3.Error as e:
+            print(f"DB Error (get_distance_at): {e}")
+            return 0
+
+    def get_distance_on(self, date_str):
+        # Odometer at the end of a day ("YYYY-MM-DD")
+        return self.get_distance_at(f"{date_str} 23:59:59")
+
+    def get_distance_gained(self, start_str, end_str):
+        # Kilometres travelled between two timestamps (inclusive)
+        before = (datetime.strptime(start_str, "%Y-%m-%d %H:%M:%S") - timedelta(seconds=1))
+        return self.get_distance_at(end_str) - self.get_distance_at(before.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def get_task_distance(self, task_id):
+        try:
+            with self._read() as cur:
+                cur.execute("SELECT km FROM task_distance WHERE task_id = ?", (task_id,))
+                row = cur.fetchone()
+            return row['km'] if row else 0
+        except sqlite3.Error as e:
+            print(f"DB Error (get_task_distance): {e}")
+            return 0
+
+    @_isolated
+    def compact_distance_ledger(self, older_than_days=90):
+        # Folds every entry of each day before the cutoff into one checkpoint per (day, task). Day-level
+        # readings and per-task totals stay exact; only the intra-day detail of old days is dropped.
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d 00:00:00")
+        try:
+            self.cursor.execute("""SELECT id, created_at, km, running_total, task_id FROM distance_ledger
+                                   WHERE created_at < ? ORDER BY created_at, id""", (cutoff,))
+            days = {}
+            for row in self.cursor.fetchall():
+                days.setdefault(row['created_at'][:10], []).append(row)
+
+            folded = 0
+            for day, rows in days.items():
+                if len(rows) < 2: continue
+                per_task = {}
+                for row in rows:
+                    per_task[row['task_id']] = per_task.get(row['task_id'], 0) + row['km']
+                if len(per_task) == len(rows): continue  # already one entry per task
+                running = rows[0]['running_total'] - rows[0]['km']
+                stamp = rows[-1]['created_at']
+                checkpoints = []
+                for task_id, km in per_task.items():
+                    running += km
+                    checkpoints.append((stamp, km, running, task_id))
+                self.cursor.executemany("DELETE FROM distance_ledger WHERE id = ?", [(r['id'],) for r in rows])
+                self.cursor.executemany(
+                    """INSERT INTO distance_ledger (created_at, kind, km, running_total, task_id)
+                       VALUES (?, 'checkpoint', ?, ?, ?)""", checkpoints)
+                folded += len(rows) - len(checkpoints)
+            self._commit()
+            return folded
+        except sqlite3.Error as e:
+            print(f"DB Error (compact_ledger): {e}")
+            self._rollback()
+            return 0
+
+    @_isolated
+    def rebuild_distance(self):
+        # Re-derives the cached odometer and per-task totals from the ledger
+        try:
+            self.cursor.execute("""UPDATE user_stats SET value = (SELECT COALESCE(SUM(km), 0) FROM distance_ledger)
+                                   WHERE key = 'total_distance'""")
+            self.cursor.execute("DELETE FROM task_distance")
+            self.cursor.execute("""INSERT INTO task_distance (task_id, km)
+                                   SELECT task_id, SUM(km) FROM distance_ledger
+                                   WHERE task_id IS NOT NULL GROUP BY task_id""")
+            self._commit()
+        except sqlite3.Error as e:
+            print(f"DB Error (rebuild_distance): {e}")
+            self._rollback()
+
+    # --- FULL-TEXT SEARCH ---
+    # tasks_fts mirrors task_name + notes (rowid = task id). Triggers on tasks keep names in step;
+    # update_task_notes indexes note bodies.
+    def _has_search_index(self, cur):
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'")
+        return cur.fetchone() is not None
+
+    def _rebuild_search_index(self):
+        for tier in self.tiers:
+            self.cursor.execute(f"DELETE FROM {tier}.tasks_fts")
+            self.cursor.execute(f"INSERT INTO {tier}.tasks_fts (rowid, task_name, notes) "
+                                f"SELECT t.id, t.task_name, {NOTES_SELECT_SQL} "
+                                f"FROM {tier}.tasks t {TIER_NOTES_JOIN_SQL.format(tier=tier)}")
+            self.cursor.execute(f"INSERT INTO {tier}.tasks_fts (tasks_fts) VALUES ('optimize')")
+
+    @_isolated
+    def rebuild_search_index(self):
+        try:
+            if not self.search_enabled: return False
+            self._rebuild_search_index()
+            self._commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"DB Error (rebuild_search_index): {e}")
+            self._rollback()
+            return False
+
+    def search(self, query, status=None, category=None, start_date=None, end_date=None, limit=50, offset=0):
+        """Tasks whose name or notes match `query`, best match first, one page of `limit` rows.
+
+        Every word must match, as a word prefix ("dep rev" finds "deploy review"). status / category
+        take a value or a list; the date range applies to completed_at, or created_at for unfinished tasks.
+        Rows are the usual task rows plus parent_name and a `snippet` of the matched text.
+
+        A very common word can match most of the table, so only the newest SEARCH_RANK_WINDOW matching tasks
+        (after filters) are ranked: finding the window edge walks the index in id order and stops early.
+        """
+        words = SEARCH_WORD_RE.findall(query or "")
+        if not words: return []
+
+        filters, params = [], []
+        for column, value in (("t.status", status), ("t.category", category)):
+            if value is None: continue
+            values = [value] if isinstance(value, str) else list(value)
+            filters.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if start_date:
+            filters.append("COALESCE(t.completed_at, t.created_at) >= ?")
+            params.append(start_date)
+        if end_date:
+            filters.append("COALESCE(t.completed_at, t.created_at) <= ?")
+            params.append(end_date)
+        filter_sql = "".join(f" AND {f}" for f in filters)
+
+        try:
+            with self._read() as cur:
+                if self.search_enabled:
+                    # Each word quoted as a prefix term: no FTS syntax gets through from user input.
+                    # Every tier has its own index; each ranks its own window and the arms are merged by rank.
+                    match = " ".join(f'"{w}"*' for w in words)
+                    from_sql = f"""
+                        FROM {{tier}}.tasks_fts
+                        JOIN {{tier}}.tasks t ON t.id = tasks_fts.rowid
+                        LEFT JOIN {{tier}}.tasks p ON p.id = t.parent_id
+                        {TIER_ROLLUP_JOIN_SQL}
+                        WHERE tasks_fts MATCH ?{filter_sql}
+                    """
+                    arms, arm_params = [], []
+                    for tier in self.tiers:
+                        cur.execute(f"SELECT tasks_fts.rowid {from_sql.format(tier=tier)} "
+                                    f"ORDER BY tasks_fts.rowid DESC LIMIT 1 OFFSET ?",
+                                    (match, *params, max(SEARCH_RANK_WINDOW, offset + limit) - 1))
+                        edge = cur.fetchone()
+                        window_sql = f" AND tasks_fts.rowid >= {int(edge[0])}" if edge else ""
+                        arms.append(f"""
+                            SELECT {TASK_SELECT_SQL}, p.task_name AS parent_name,
+                                   snippet(tasks_fts, -1, '[', ']', '…', 10) AS snippet,
+                                   tasks_fts.rank AS search_rank
+                            {from_sql.format(tier=tier)}{window_sql}
+                        """)
+                        arm_params.extend((match, *params))
+                    cur.execute(" UNION ALL ".join(arms) + " ORDER BY search_rank LIMIT ? OFFSET ?",
+                                (*arm_params, limit, offset))
+                else:
+                    like_sql = " AND ".join("(t.task_name LIKE ? OR note_text(n.compressed, n.body) LIKE ?)"
+                                            for _ in words)
+                    like_params = [p for w in words for p in (f"%{w}%", f"%{w}%")]
+                    sql, all_params = self._tiered(f"""
+                        SELECT {TASK_SELECT_SQL}, p.task_name AS parent_name, t.task_name AS snippet
+                        FROM {{tier}}.tasks t
+                        LEFT JOIN {{tier}}.tasks p ON p.id = t.parent_id
+                        {TIER_ROLLUP_JOIN_SQL} {TIER_NOTES_JOIN_SQL}
+                        WHERE {like_sql}{filter_sql}
+                    """, (*like_params, *params))
+                    cur.execute(sql + " ORDER BY id DESC LIMIT ? OFFSET ?", (*all_params, limit, offset))
+                return cur.fetchall()
+        except sqlite3.Error as e:
+            print(f"DB Error (search): {e}")
+            return []
+
+    # --- ARCHIVE TIERS ---
+    # compact_archive() moves whole archived trees (tasks, sessions, notes, rollups, search rows) into the cold
+    # database; reopen_task(), or any edit of a cold task, moves its tree back. A move is two commits, copy then
+    # delete, so a crash in between leaves the tree in both tiers rather than in neither; _repair_tiers() settles
+    # that, the main copy wins.
+    def _tiered(self, arm_sql, params=()):
+        # One copy of arm_sql per tier ({tier} filled in), joined with UNION ALL; params repeat per arm
+        sql = " UNION ALL ".join(arm_sql.format(tier=tier) for tier in self.tiers)
+        return sql, tuple(params) * len(self.tiers)
+
+    def _tier_of(self, cur, task_id):
+        for tier in self.tiers:
+            cur.execute(f"SELECT 1 FROM {tier}.tasks WHERE id = ?", (task_id,))
+            if cur.fetchone() is not None: return tier
+        return None
+
+    def _init_cold_tier(self):
+        # The cold tables mirror the main ones; columns added to main by later migrations are added here too
+        try:
+            for table, _ in TIER_TABLES:
+                self.cursor.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,))
+                create_sql = self.cursor.fetchone()[0]
+                self.cursor.execute(re.sub(r"^CREATE TABLE \"?(\w+)\"?", r"CREATE TABLE IF NOT EXISTS cold.\1",
+                                           create_sql))
+                self.cursor.execute(f"PRAGMA cold.table_info({table})")
+                cold_columns = {info[1] for info in self.cursor.fetchall()}
+                self.cursor.execute(f"PRAGMA main.table_info({table})")
+                for info in self.cursor.fetchall():
+                    if info[1] in cold_columns: continue
+                    default = f" DEFAULT {info[4]}" if info[4] is not None else ""
+                    self.cursor.execute(f"ALTER TABLE cold.{table} ADD COLUMN {info[1]} {info[2]}{default}")
+            self.cursor.execute(f"""SELECT sql FROM main.sqlite_master WHERE type = 'index' AND sql IS NOT NULL
+                                    AND tbl_name IN ({', '.join(repr(t) for t, _ in TIER_TABLES)})""")
+            for (index_sql,) in self.cursor.fetchall():
+                self.cursor.execute(re.sub(r"^CREATE (UNIQUE )?INDEX (IF NOT EXISTS )?(\w+)",
+                                           r"CREATE \1INDEX IF NOT EXISTS cold.\3", index_sql))
+            if self.search_enabled:
+                self.cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS cold.tasks_fts USING fts5({SEARCH_FTS_COLUMNS})")
+            self.conn.commit()
+            self.tiers = TIERS
+        except sqlite3.Error as e:
+            print(f"DB Error (init_cold_tier): {e}")
             self.conn.rollback()
 
+    def _move_tree(self, root_id, source, target):
+        # Copies root_id's tree from one tier to the other, commits, then deletes the source copy and commits.
+        # Both commits are real ones: SQLite doesn't commit one transaction atomically across attached WAL files,
+        # so copy and delete must never share a transaction (and so never run inside batch()).
+        self._require_unbatched()
+        self.cursor.execute("CREATE TEMP TABLE IF NOT EXISTS tier_move (id INTEGER PRIMARY KEY)")
+        self.cursor.execute("DELETE FROM temp.tier_move")
+        self.cursor.execute(f"INSERT INTO temp.tier_move (id) SELECT ? UNION ALL "
+                            f"SELECT id FROM ({TIER_DESCENDANT_IDS_SQL.format(tier=source)})", (root_id, root_id))
+        moved = "SELECT id FROM temp.tier_move"
+
+        # Rows already in main win (see _repair_tiers), so copies into main never replace
+        verb = "INSERT OR IGNORE" if target == "main" else "INSERT OR REPLACE"
+        for table, key in TIER_TABLES:
+            self.cursor.execute(f"PRAGMA main.table_info({table})")
+            columns = ", ".join(info[1] for info in self.cursor.fetchall())
+            self.cursor.execute(f"{verb} INTO {target}.{table} ({columns}) "
+                                f"SELECT {columns} FROM {source}.{table} WHERE {key} IN ({moved})")
+        if self.search_enabled:
+            # After the main insert trigger, so the moved text replaces the name-only row it wrote
+            self.cursor.execute(f"DELETE FROM {target}.tasks_fts WHERE rowid IN ({moved})")
+            self.cursor.execute(f"INSERT INTO {target}.tasks_fts (rowid, task_name, notes) "
+                                f"SELECT rowid, task_name, notes FROM {source}.tasks_fts WHERE rowid IN ({moved})")
+        self.conn.commit()
+
+        for table, key in reversed(TIER_TABLES):
+            self.cursor.execute(f"DELETE FROM {source}.{table} WHERE {key} IN ({moved})")
+        if self.search_enabled and source == "cold":
+            self.cursor.execute(f"DELETE FROM cold.tasks_fts WHERE rowid IN ({moved})")  # main's trigger did its own
+        self.cursor.execute("SELECT COUNT(*) FROM temp.tier_move")
+        count = self.cursor.fetchone()[0]
+        self.conn.commit()
+        return count
+
+    def _require_unbatched(self):
+        if self._batch_depth:
+            raise sqlite3.OperationalError("archive tier moves can't run inside batch()")
+
+    def _repair_tiers(self):
+        # A tree left in both tiers by an interrupted move keeps its main copy
+        for table, key in TIER_TABLES:
+            self.cursor.execute(f"DELETE FROM cold.{table} WHERE {key} IN (SELECT id FROM main.tasks)")
+        if self.search_enabled:
+            self.cursor.execute("DELETE FROM cold.tasks_fts WHERE rowid IN (SELECT id FROM main.tasks)")
+
+    @_isolated
+    def compact_archive(self, older_than_days=180, max_trees=50):
+        """Moves up to max_trees archived trees, finished more than older_than_days ago, to the cold tier.
+
+        A tree qualifies when its root is top-level and every task in it is ARCHIVED and finished (completed_at,
+        or created_at when it was never completed) before the cutoff. Returns the number of tasks moved.
+        """
+        if "cold" not in self.tiers: return 0
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self._require_unbatched()
+            self._repair_tiers()
+            self.conn.commit()
+            self.cursor.execute("""
+                WITH RECURSIVE tree(root, id) AS (
+                    SELECT id, id FROM main.tasks WHERE parent_id IS NULL AND status = 'ARCHIVED'
+                    UNION ALL
+                    SELECT tree.root, t.id FROM main.tasks t JOIN tree ON t.parent_id = tree.id
+                )
+                SELECT tree.root FROM tree JOIN main.tasks d ON d.id = tree.id
+                GROUP BY tree.root
+                HAVING SUM(d.status != 'ARCHIVED' OR COALESCE(d.completed_at, d.created_at) >= ?) = 0
+                ORDER BY MAX(COALESCE(d.completed_at, d.created_at))
+                LIMIT ?
+            """, (cutoff, max_trees))
+            moved = 0
+            for (root_id,) in self.cursor.fetchall():
+                moved += self._move_tree(root_id, "main", "cold")
+            return moved
+        except sqlite3.Error as e:
+            print(f"DB Error (compact_archive): {e}")
+            self._rollback()
+            return 0
+
+    def _restore_tree(self, task_id):
+        # Brings the cold tree containing task_id back to the main tier (a no-op for tasks already there)
+        if "cold" not in self.tiers: return
+        self.cursor.execute("SELECT 1 FROM main.tasks WHERE id = ?", (task_id,))
+        if self.cursor.fetchone() is not None: return
+        self.cursor.execute("""
+            WITH RECURSIVE up(id, parent_id) AS (
+                SELECT id, parent_id FROM cold.tasks WHERE id = ?
+                UNION ALL
+                SELECT t.id, t.parent_id FROM cold.tasks t JOIN up ON t.id = up.parent_id
+            )
+            SELECT id FROM up WHERE parent_id IS NULL
+        """, (task_id,))
+        row = self.cursor.fetchone()
+        if row is not None:
+            self._move_tree(row[0], "cold", "main")
+
     # --- EXISTING METHODS ---
+    @_isolated
     def add_task(self, task_name, due_date=None, category="Work", parent_id=None):
         try:
             created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.cursor.execute(
                 """INSERT INTO tasks 
-                   (parent_id, task_name, due_date, category, created_at, status, time_spent, session_goal_seconds, notes) 
-                   VALUES (?, ?, ?, ?, ?, 'NEW', 0, NULL, '')""",
+                   (parent_id, task_name, due_date, category, created_at, status, time_spent, session_goal_seconds) 
+                   VALUES (?, ?, ?, ?, ?, 'NEW', 0, NULL)""",
                 (parent_id, task_name, due_date, category, created_at)
             )
-            self.conn.commit()
-            return self.cursor.lastrowid
+            task_id = self.cursor.lastrowid
+            self._rollup_insert(task_id)
+            self._commit()
+            return task_id
         except sqlite3.Error as e:
             print(f"DB Error (add_task): {e}")
-            self.conn.rollback()
+            self._rollback()
             return None
 
+    def _store_note(self, task_id, notes_text):
+        if notes_text and notes_text.strip():
+            compressed, body = encode_note(notes_text)
+            self.cursor.execute(
+                """INSERT INTO task_notes (task_id, compressed, body) VALUES (?, ?, ?)
+                   ON CONFLICT(task_id) DO UPDATE SET compressed = excluded.compressed, body = excluded.body""",
+                (task_id, compressed, body))
+            self.cursor.execute("UPDATE tasks SET has_notes = 1, notes_len = ? WHERE id = ?",
+                                (len(notes_text), task_id))
+        else:
+            self.cursor.execute("DELETE FROM task_notes WHERE task_id = ?", (task_id,))
+            self.cursor.execute("UPDATE tasks SET has_notes = 0, notes_len = 0 WHERE id = ?", (task_id,))
+
+    @_isolated
     def update_task_notes(self, task_id, notes_text):
         try:
-            self.cursor.execute("UPDATE tasks SET notes = ? WHERE id = ?", (notes_text, task_id))
-            self.conn.commit()
+            self._restore_tree(task_id)
+            self._store_note(task_id, notes_text)
+            if self.search_enabled:
+                self.cursor.execute("UPDATE tasks_fts SET notes = ? WHERE rowid = ?", (notes_text or "", task_id))
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (update_notes): {e}")
-            self.conn.rollback()
+            self._rollback()
+
+    def get_task_notes(self, task_id):
+        # The note body is only read here and by the report readers; task rows just carry has_notes / notes_len
+        try:
+            with self._read() as cur:
+                cur.execute(*self._tiered("SELECT compressed, body FROM {tier}.task_notes WHERE task_id = ?", (task_id,)))
+                row = cur.fetchone()
+                return decode_note(row['compressed'], row['body']) if row else ""
+        except sqlite3.Error as e:
+            print(f"DB Error (get_notes): {e}")
+            return ""
 
     def get_tasks(self, parent_id=None):
         try:
-            query = "SELECT * FROM tasks WHERE parent_id IS ?"
-            self.cursor.execute(query, (parent_id,))
-            return self.cursor.fetchall()
+            query = f"SELECT {TASK_SELECT_SQL} FROM tasks t {ROLLUP_JOIN_SQL} WHERE t.parent_id IS ?"
+            with self._read() as cur:
+                cur.execute(query, (parent_id,))
+                return cur.fetchall()
         except sqlite3.Error as e:
             print(f"DB Error (get_tasks): {e}")
             return []
 
     def get_task_by_id(self, task_id):
         try:
-            self.cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-            return self.cursor.fetchone()
+            with self._read() as cur:
+                sql, params = self._tiered(f"SELECT {TASK_SELECT_SQL} FROM {{tier}}.tasks t {TIER_ROLLUP_JOIN_SQL} "
+                                           f"WHERE t.id = ?", (task_id,))
+                cur.execute(sql, params)
+                return cur.fetchone()
         except sqlite3.Error as e:
             print(f"DB Error (get_task_by_id): {e}")
             return None
 
-    def get_task_hierarchy(self, task_id):
-        # Recursive, read-only: less risk of locking, but good to handle errors
-        try:
-            parent = self.get_task_by_id(task_id)
-            if not parent: return []
-            results = [dict(parent)]
-            children = self.get_tasks(parent_id=task_id)
-            for child in children:
-                results.extend(self.get_task_hierarchy(child['id']))
-            return results
-        except Exception as e:
+    def load_forest(self, categories=None, include_archived=False):
+        # One recursive query for the whole tree instead of one get_tasks() per node.
+        # Returns root dicts with their children already attached under 'children'.
+        try:
+            status_filter = "" if include_archived else "AND t.status != 'ARCHIVED'"
+            root_filter = ""
+            params = []
+            if categories:
+                root_filter = f"AND t.category IN ({', '.join('?' * len(categories))})"
+                params.extend(categories)
+            query = f"""
+                WITH RECURSIVE forest(id) AS (
+                    SELECT t.id FROM tasks t
+                    WHERE t.parent_id IS NULL {status_filter} {root_filter}
+                    UNION ALL
+                    SELECT t.id FROM tasks t
+                    JOIN forest f ON t.parent_id = f.id
+                    WHERE 1 {status_filter}
+                )
+                SELECT {TASK_SELECT_SQL} FROM tasks t JOIN forest f ON t.id = f.id {ROLLUP_JOIN_SQL}
+                ORDER BY t.id
+            """
+            with self._read() as cur:
+                cur.execute(query, tuple(params))
+                rows = cur.fetchall()
+        except sqlite3.Error as e:
+            print(f"DB Error (load_forest): {e}")
+            return []
+
+        nodes = {}
+        for row in rows:
+            node = dict(row)
+            node['children'] = []
+            nodes[node['id']] = node
+
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node['parent_id'])
+            if parent is not None:
+                parent['children'].append(node)
+            else:
+                roots.append(node)
+        return roots
+
+    def get_task_hierarchy(self, task_id, include_notes=False):
+        # One recursive select for the whole subtree; depth-first order is rebuilt in Python
+        notes_sql = (f", {NOTES_SELECT_SQL}", TIER_NOTES_JOIN_SQL) if include_notes else ("", "")
+        try:
+            with self._read() as cur:
+                tier = self._tier_of(cur, task_id)
+                if tier is None: return []
+                cur.execute(f"""
+                    SELECT {TASK_SELECT_SQL}{notes_sql[0]} FROM {{tier}}.tasks t {TIER_ROLLUP_JOIN_SQL} {notes_sql[1]}
+                    WHERE t.id = ? OR t.id IN ({TIER_DESCENDANT_IDS_SQL})
+                """.format(tier=tier), (task_id, task_id))
+                rows = [dict(r) for r in cur.fetchall()]
+        except sqlite3.Error as e:
             print(f"Error getting hierarchy: {e}")
             return []
 
+        children = {}
+        root = None
+        for row in rows:
+            if row['id'] == task_id:
+                root = row
+            else:
+                children.setdefault(row['parent_id'], []).append(row)
+        if root is None: return []
+
+        # Pre-order walk (parent, then children by id) with an explicit stack, so deep trees can't hit the
+        # recursion limit
+        results = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            results.append(node)
+            stack.extend(sorted(children.get(node['id'], []), key=lambda r: r['id'], reverse=True))
+        return results
+
+    def iter_task_hierarchy(self, task_id):
+        # Same rows and order as get_task_hierarchy (plus depth and the note bodies, for reports), but sorted
+        # by SQLite on a materialized id path and streamed from the cursor in chunks
+        try:
+            with self._read() as cur:
+                tier = self._tier_of(cur, task_id)
+                if tier is None: return
+                cur.execute(f"""
+                    WITH RECURSIVE tree(id, depth, path) AS (
+                        SELECT id, 0, printf('%010d', id) FROM {{tier}}.tasks WHERE id = ?
+                        UNION ALL
+                        SELECT t.id, tree.depth + 1, tree.path || '/' || printf('%010d', t.id)
+                        FROM {{tier}}.tasks t JOIN tree ON t.parent_id = tree.id
+                    )
+                    SELECT {TASK_SELECT_SQL}, tree.depth, {NOTES_SELECT_SQL} FROM tree
+                    JOIN {{tier}}.tasks t ON t.id = tree.id {TIER_ROLLUP_JOIN_SQL} {TIER_NOTES_JOIN_SQL}
+                    ORDER BY tree.path
+                """.format(tier=tier), (task_id,))
+                while True:
+                    rows = cur.fetchmany(STREAM_FETCH_ROWS)
+                    if not rows: return
+                    yield from rows
+        except sqlite3.Error as e:
+            print(f"Error streaming hierarchy: {e}")
+
     def get_all_archived_tasks(self, min_date=None):
+        # Both tiers: recent archives in the main database, older trees in the cold one
         try:
-            query = """
-                SELECT t.*, p.task_name as parent_name 
-                FROM tasks t
-                LEFT JOIN tasks p ON t.parent_id = p.id
+            query = f"""
+                SELECT {TASK_SELECT_SQL}, p.task_name as parent_name 
+                FROM {{tier}}.tasks t
+                LEFT JOIN {{tier}}.tasks p ON t.parent_id = p.id
+                {TIER_ROLLUP_JOIN_SQL}
                 WHERE t.status = 'ARCHIVED'
             """
             params = []
             if min_date:
                 query += " AND t.completed_at >= ?"
                 params.append(min_date)
-            query += " ORDER BY t.completed_at DESC"
-            self.cursor.execute(query, tuple(params))
-            return self.cursor.fetchall()
+            query, params = self._tiered(query, params)
+            query += " ORDER BY completed_at DESC"
+            with self._read() as cur:
+                cur.execute(query, params)
+                return cur.fetchall()
         except sqlite3.Error as e:
             print(f"DB Error (get_archived): {e}")
             return []
 
+    def get_archived_page(self, min_date=None, after=None, limit=100):
+        # Keyset page of the archive, newest first by (completed_at, id); after is that pair for the last row
+        # already shown. Rows archived along with a parent have no completed_at: they only match without a
+        # min_date, and come after every dated row (newest id first).
+        try:
+            with self._read() as cur:
+                rows = []
+                if after is None or after[0] is not None:
+                    where, params = "t.completed_at IS NOT NULL", []
+                    if min_date:
+                        where += " AND t.completed_at >= ?"
+                        params.append(min_date)
+                    if after:
+                        where += " AND (t.completed_at, t.id) < (?, ?)"
+                        params.extend(after)
+                    rows = self._archived_page(cur, where, params, limit)
+                if len(rows) < limit and not min_date:
+                    where, params = "t.completed_at IS NULL", []
+                    if after and after[0] is None:
+                        where += " AND t.id < ?"
+                        params.append(after[1])
+                    rows += self._archived_page(cur, where, params, limit - len(rows))
+                return rows
+        except sqlite3.Error as e:
+            print(f"DB Error (get_archived_page): {e}")
+            return []
+
+    def _archived_page(self, cur, where, params, limit):
+        # Each tier is cut to limit rows on idx_tasks_status_completed before the merge, so a page costs the
+        # same however far back it is
+        query, params = self._tiered(f"""
+            SELECT * FROM (
+                SELECT {TASK_SELECT_SQL}, p.task_name as parent_name
+                FROM {{tier}}.tasks t
+                LEFT JOIN {{tier}}.tasks p ON t.parent_id = p.id
+                {TIER_ROLLUP_JOIN_SQL}
+                WHERE t.status = 'ARCHIVED' AND {where}
+                ORDER BY t.completed_at DESC, t.id DESC
+                LIMIT ?
+            )
+        """, params + [limit])
+        cur.execute(query + " ORDER BY completed_at DESC, id DESC LIMIT ?", params + (limit,))
+        return cur.fetchall()
+
+    @_isolated
     def update_task_fields(self, task_id, new_name, new_eta):
         try:
+            self._restore_tree(task_id)
             self.cursor.execute(
                 "UPDATE tasks SET task_name = ?, due_date = ? WHERE id = ?",
                 (new_name, new_eta, task_id)
             )
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (update_fields): {e}")
-            self.conn.rollback()
+            self._rollback()
 
+    @_isolated
     def delete_task(self, task_id):
         try:
+            self._restore_tree(task_id)
+            self._rollup_remove_subtree(task_id)
+            self._buckets_remove_subtree(task_id)
             self.cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (delete_task): {e}")
-            self.conn.rollback()
+            self._rollback()
 
+    @_isolated
     def start_timer(self, task_id, goal_seconds=None):
         try:
             start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._collect_status_flips("id = ?", (task_id,), to_open=True)
             self.cursor.execute(
                 "UPDATE tasks SET current_session_start = ?, session_goal_seconds = ?, status = 'IN_PROGRESS' WHERE id = ?",
                 (start_time, goal_seconds, task_id)
             )
-            self.conn.commit()
+            self._apply_status_flips(to_open=True)
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (start_timer): {e}")
-            self.conn.rollback()
+            self._rollback()
 
+    @_isolated
     def stop_timer(self, task_id):
         # Returns elapsed seconds so Main App can calculate Distance
         try:
-            self.cursor.execute("SELECT current_session_start, parent_id FROM tasks WHERE id = ?", (task_id,))
+            self.cursor.execute("SELECT current_session_start, category FROM tasks WHERE id = ?", (task_id,))
             row = self.cursor.fetchone()
             elapsed = 0
 
@@ -225,112 +1463,110 @@ class TodoDatabase:
                     (task_id, start_str, end_str, elapsed)
                 )
 
-                if row['parent_id']:
-                    self._propagate_time_upwards(row['parent_id'], elapsed)
+                self._rollup_add_seconds(task_id, elapsed)
+                if elapsed > 0:
+                    self._buckets_add_session(task_id, row['category'], start_dt, elapsed)
 
-                self.conn.commit()
+                self._commit()
 
             return elapsed
         except sqlite3.Error as e:
             print(f"DB Error (stop_timer): {e}")
-            self.conn.rollback()
+            self._rollback()
             return 0
 
-    def _propagate_time_upwards(self, parent_id, seconds_to_add):
-        # Helper method used inside a transaction, so we don't commit here individually
-        # Exceptions will be caught by the caller (stop_timer)
-        curr_id = parent_id
-        while curr_id is not None:
-            self.cursor.execute("UPDATE tasks SET time_spent = time_spent + ? WHERE id = ?", (seconds_to_add, curr_id))
-            self.cursor.execute("SELECT parent_id FROM tasks WHERE id = ?", (curr_id,))
-            res = self.cursor.fetchone()
-            curr_id = res['parent_id'] if res else None
-
+    @_isolated
     def mark_completed(self, task_id):
         try:
-            self.stop_timer(task_id)
-            completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.cursor.execute("UPDATE tasks SET status = 'COMPLETED', completed_at = ? WHERE id = ?",
-                                (completed_at, task_id))
-            self._mark_children_status(task_id, 'COMPLETED', completed_at)
-            self.conn.commit()
+            with self.batch():  # stop_timer's commit folds into this one
+                self.stop_timer(task_id)
+                self._collect_status_flips(f"id = ? OR id IN ({DESCENDANT_IDS_SQL})", (task_id, task_id), to_open=False)
+                completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.cursor.execute("UPDATE tasks SET status = 'COMPLETED', completed_at = ? WHERE id = ?",
+                                    (completed_at, task_id))
+                self._mark_children_status(task_id, 'COMPLETED', completed_at)
+                self._apply_status_flips(to_open=False)
         except sqlite3.Error as e:
             print(f"DB Error (mark_completed): {e}")
-            self.conn.rollback()
+            self._rollback()
 
+    @_isolated
     def archive_task(self, task_id):
         try:
-            self.stop_timer(task_id)
-            self.cursor.execute("UPDATE tasks SET status = 'ARCHIVED' WHERE id = ?", (task_id,))
-            self._mark_children_status(task_id, 'ARCHIVED', None)
-            self.conn.commit()
+            with self.batch():
+                self.stop_timer(task_id)
+                self._collect_status_flips(f"id = ? OR id IN ({DESCENDANT_IDS_SQL})", (task_id, task_id), to_open=False)
+                self.cursor.execute("UPDATE tasks SET status = 'ARCHIVED' WHERE id = ?", (task_id,))
+                self._mark_children_status(task_id, 'ARCHIVED', None)
+                self._apply_status_flips(to_open=False)
         except sqlite3.Error as e:
             print(f"DB Error (archive_task): {e}")
-            self.conn.rollback()
+            self._rollback()
 
+    @_isolated
     def archive_all_completed(self):
         try:
             self.cursor.execute("UPDATE tasks SET status = 'ARCHIVED' WHERE status = 'COMPLETED'")
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (archive_all): {e}")
-            self.conn.rollback()
+            self._rollback()
 
     def _mark_children_status(self, parent_id, status, completed_at):
         # Helper used inside transactions
-        self.cursor.execute("SELECT id FROM tasks WHERE parent_id = ?", (parent_id,))
-        children = self.cursor.fetchall()
-        for child in children:
-            self.cursor.execute("UPDATE tasks SET status = ?, completed_at = ? WHERE id = ?",
-                                (status, completed_at, child['id']))
-            self._mark_children_status(child['id'], status, completed_at)
+        self.cursor.execute(f"UPDATE tasks SET status = ?, completed_at = ? WHERE id IN ({DESCENDANT_IDS_SQL})",
+                            (status, completed_at, parent_id))
 
+    @_isolated
     def reopen_task(self, task_id):
         try:
+            self._restore_tree(task_id)  # reopened work lives in the main tier
+            self._collect_status_flips(
+                f"id = ? OR id IN ({ANCESTOR_IDS_SQL}) OR id IN ({DESCENDANT_IDS_SQL})", (task_id, task_id, task_id),
+                to_open=True)
             self.cursor.execute("UPDATE tasks SET status = 'NEW', completed_at = NULL WHERE id = ?", (task_id,))
-            curr_id = task_id
-            while curr_id:
-                self.cursor.execute("SELECT parent_id FROM tasks WHERE id = ?", (curr_id,))
-                res = self.cursor.fetchone()
-                if res and res['parent_id']:
-                    self.cursor.execute(
-                        "UPDATE tasks SET status = 'NEW', completed_at = NULL WHERE id = ? AND status IN ('COMPLETED', 'ARCHIVED')",
-                        (res['parent_id'],))
-                    curr_id = res['parent_id']
-                else:
-                    curr_id = None
+            self.cursor.execute(
+                f"""UPDATE tasks SET status = 'NEW', completed_at = NULL
+                    WHERE status IN ('COMPLETED', 'ARCHIVED') AND id IN ({ANCESTOR_IDS_SQL})""",
+                (task_id,))
             self._mark_children_status(task_id, 'NEW', None)
-            self.conn.commit()
+            self._apply_status_flips(to_open=True)
+            self._commit()
         except sqlite3.Error as e:
             print(f"DB Error (reopen_task): {e}")
-            self.conn.rollback()
+            self._rollback()
 
     def get_tasks_for_report(self, start_date_str, end_date_str):
         try:
-            query = """
-                SELECT DISTINCT 
-                    t.*, 
-                    p.task_name as parent_name 
-                FROM tasks t
-                LEFT JOIN sessions s ON t.id = s.task_id
-                LEFT JOIN tasks p ON t.parent_id = p.id
-                WHERE 
-                    (
-                        (t.completed_at BETWEEN ? AND ?) OR
-                        (s.start_time BETWEEN ? AND ?) OR
-                        (t.created_at BETWEEN ? AND ?)
-                    )
-                    AND t.category != 'Personal'
-            """
-            params = (start_date_str, end_date_str, start_date_str, end_date_str, start_date_str, end_date_str)
-            self.cursor.execute(query, params)
-            return self.cursor.fetchall()
+            with self._read() as cur:
+                cur.execute(self._report_sql(""), _report_params(start_date_str, end_date_str, self.tiers))
+                return cur.fetchall()
         except sqlite3.Error as e:
             print(f"DB Error (get_report): {e}")
             return []
 
+    def _report_sql(self, extra):
+        return REPORT_TRACKED_SQL + " UNION ALL ".join(REPORT_TASKS_ARM_SQL.format(tier=tier, extra=extra)
+                                                       for tier in self.tiers)
+
+    def iter_tasks_for_report(self, start_date_str, end_date_str, completed):
+        # Streaming form of get_tasks_for_report for one report section: completed/archived tasks or the rest,
+        # filtered in SQL and fetched in chunks so the full result set is never held in memory
+        status_sql = "IN ('COMPLETED', 'ARCHIVED')" if completed else "NOT IN ('COMPLETED', 'ARCHIVED')"
+        try:
+            with self._read() as cur:
+                cur.execute(self._report_sql(f" AND t.status {status_sql}"),
+                            _report_params(start_date_str, end_date_str, self.tiers))
+                while True:
+                    rows = cur.fetchmany(STREAM_FETCH_ROWS)
+                    if not rows: return
+                    yield from rows
+        except sqlite3.Error as e:
+            print(f"DB Error (iter_report): {e}")
+
     def close(self):
         try:
-            self.conn.close()
+            self.flush()
+            self.connections.close()
         except sqlite3.Error as e:
             print(f"DB Error (close): {e}")
\ No newline at end of file
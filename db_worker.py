@@ -0,0 +1,199 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from scheduler import PRIORITY_HIGH
+
+logger = logging.getLogger("MarioSys")
+
+
+class _Job:
+    __slots__ = ("fn", "args", "on_done", "key", "batch", "future")
+
+    def __init__(self, fn, args, on_done, key, batch=True):
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.key = key
+        self.batch = batch
+        self.future = Future()
+
+
+class _Lane:
+    """One background thread draining a FIFO of jobs, with keyed coalescing of jobs that haven't started."""
+
+    def __init__(self, name, run_batch):
+        self.name = name
+        self.run_batch = run_batch
+        self.jobs = queue.Queue()
+        self.pending = {}  # key -> queued job not yet picked up
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._loop, name=name, daemon=True)
+
+    def submit(self, fn, args, on_done, key, batch=True):
+        with self.lock:
+            if key is not None and key in self.pending:
+                # Coalesce: the queued job runs once, with the newest arguments and callback
+                job = self.pending[key]
+                job.fn, job.args, job.on_done, job.batch = fn, args, on_done, batch
+                return job.future
+            job = _Job(fn, args, on_done, key, batch)
+            if key is not None:
+                self.pending[key] = job
+        self.jobs.put(job)
+        return job.future
+
+    def cancel(self, key):
+        # Drops the queued job for key; one that has already started runs to the end
+        with self.lock:
+            job = self.pending.pop(key, None)
+        return job is not None and job.future.cancel()
+
+    def _take(self, job):
+        with self.lock:
+            if job is not None and job.key is not None and self.pending.get(job.key) is job:
+                del self.pending[job.key]
+
+    def _loop(self):
+        while True:
+            job = self.jobs.get()
+            if job is None: return
+            batch = [job]
+            # Drain whatever else is already queued so it shares one run (one transaction on the write lane)
+            while True:
+                try:
+                    nxt = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self.jobs.put(None)
+                    break
+                batch.append(nxt)
+            for j in batch: self._take(j)
+            self.run_batch(batch)
+
+
+class DatabaseWorker:
+    """Runs TodoDatabase work off the Tk main thread.
+
+    Writes go to one writer thread that owns the writer connection; jobs queued together are run inside a
+    single db.batch(), so a burst of clicks costs one commit. Reads go to a reader thread using the pooled
+    read-only connections (or share the writer lane when the database can't pool readers).
+
+    Results are delivered back on the Tk thread: completed jobs are queued and a "db_results" job on the
+    app's TickScheduler calls each job's on_done(result). Submitting with a key coalesces with a queued job of the same
+    key, so five rapid refresh requests trigger one load, and cancel_read(key) drops it.
+    """
+
+    def __init__(self, db, scheduler, poll_ms=30):
+        self.db = db
+        self.scheduler = scheduler
+        self.poll_ms = poll_ms
+        self.done = queue.SimpleQueue()
+        self.running = True
+
+        self.write_lane = _Lane("db-writer", self._run_writes)
+        self.read_lane = _Lane("db-reader", self._run_reads) if db.connections.pooled else self.write_lane
+        self.write_lane.thread.start()
+        if self.read_lane is not self.write_lane:
+            self.read_lane.thread.start()
+        scheduler.every("db_results", poll_ms, self._poll, priority=PRIORITY_HIGH)
+
+    # --- SUBMISSION (Tk thread) ---
+    def submit_write(self, fn, *args, on_done=None, key=None, batch=True):
+        # batch=False runs the job on its own, outside any batch (for work that has to commit by itself,
+        # like moving archive trees between tiers)
+        return self.write_lane.submit(fn, args, on_done, key, batch)
+
+    def submit_read(self, fn, *args, on_done=None, key=None):
+        return self.read_lane.submit(fn, args, on_done, key)
+
+    def cancel_read(self, key):
+        return self.read_lane.cancel(key)
+
+    # --- EXECUTION (worker threads) ---
+    def _run_writes(self, jobs):
+        self.db.bind_writer_thread()
+        # Consecutive batchable jobs share one transaction; an unbatched job runs alone, in queue order
+        group = []
+        for job in jobs:
+            if job.batch:
+                group.append(job)
+                continue
+            if group: self._run_write_batch(group)
+            group = []
+            self._run(job)
+            self.done.put(job)
+        if group: self._run_write_batch(group)
+
+    def _run_write_batch(self, jobs):
+        ran, committed = [], False
+        try:
+            with self.db.batch():
+                for job in jobs:
+                    if not job.future.set_running_or_notify_cancel(): continue
+                    try:
+                        # Each job in its own savepoint: a failing job takes back its writes and nobody else's
+                        with self.db.savepoint():
+                            result = job.fn(*job.args)
+                    except Exception as e:
+                        logger.error(f"DB worker job {getattr(job.fn, '__name__', job.fn)} failed: {e}")
+                        job.future.set_exception(e)
+                    else:
+                        ran.append((job, result))
+                committed = self.db.flush()
+        except Exception as e:
+            logger.error(f"DB worker batch failed: {e}")
+        # Results are only published once the batch has committed; if the commit failed, every job in it failed
+        for job, result in ran:
+            if committed:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(RuntimeError("DB worker batch was rolled back"))
+        for job in jobs:
+            # Jobs the batch never reached (it failed before them) still get an answer
+            if not job.future.done(): job.future.set_exception(RuntimeError("DB worker batch failed"))
+            self.done.put(job)
+
+    def _run_reads(self, jobs):
+        for job in jobs:
+            self._run(job)
+            self.done.put(job)
+
+    def _run(self, job):
+        if not job.future.set_running_or_notify_cancel(): return
+        try:
+            job.future.set_result(job.fn(*job.args))
+        except Exception as e:
+            logger.error(f"DB worker job {getattr(job.fn, '__name__', job.fn)} failed: {e}")
+            job.future.set_exception(e)
+
+    # --- DELIVERY (Tk thread) ---
+    def _poll(self):
+        if not self.running: return
+        while True:
+            try:
+                job = self.done.get_nowait()
+            except queue.Empty:
+                break
+            # Never wait on the Tk thread: only finished, successful jobs get their callback
+            if job.on_done is None or not job.future.done() or job.future.cancelled(): continue
+            if job.future.exception(timeout=0) is not None: continue
+            try:
+                job.on_done(job.future.result())
+            except Exception as e:
+                logger.error(f"DB callback failed: {e}")
+
+    def shutdown(self, timeout=5.0):
+        # Finishes every queued job (pending writes included) and stops the threads; callbacks are dropped.
+        # Returns False if a lane is still running after the timeout: its connection is then still in use.
+        self.running = False
+        self.scheduler.cancel("db_results")
+        lanes = {id(self.write_lane): self.write_lane, id(self.read_lane): self.read_lane}.values()
+        for lane in lanes:
+            lane.jobs.put(None)
+            lane.thread.join(timeout)
+        stopped = not any(lane.thread.is_alive() for lane in lanes)
+        if not stopped: logger.error("DB worker still busy at shutdown; leaving its connection open")
+        return stopped
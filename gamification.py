@@ -1,23 +1,56 @@
+import bisect
 import json
 import random
 import os
 from datetime import datetime
 
+from lore import ShuffleBag, load_lore
+
+
+class MilestoneIndex:
+    """The lore milestones, sorted by distance once at load; every lookup is a bisect over the distances."""
+
+    def __init__(self, milestones):
+        self.milestones = sorted(milestones, key=lambda m: m["distance"])  # the lore list itself stays untouched
+        self.distances = [m["distance"] for m in self.milestones]
+
+    def __len__(self):
+        return len(self.milestones)
+
+    def __iter__(self):
+        return iter(self.milestones)
+
+    def next_index(self, km):
+        # Index of the first milestone still ahead of km (== number of milestones reached)
+        return bisect.bisect_right(self.distances, km)
+
+    def next_target(self, km):
+        i = self.next_index(km)
+        return self.milestones[i] if i < len(self.milestones) else None
+
+    def crossed(self, old_km, new_km):
+        # Every milestone passed moving from old_km to new_km, in order (old_km < distance <= new_km)
+        return self.milestones[self.next_index(old_km):self.next_index(new_km)]
+
 
 class FlightComputer:
     def __init__(self, db):
         self.db = db
         self.lore_data = self._load_lore()
+        self._milestones = None
         self.km_per_second = 100
 
         # --- NEW: SHUFFLE BAGS ---
-        # We create copies of the lists to pull from, so we can deplete them without ruining the master list.
-        self.boot_bag = list(self.lore_data.get("boot_sequence", []))
-        self.idle_bag = list(self.lore_data.get("idle_logs", []))
+        # Bags draw from the lore lists in place (no copies); a new random order starts when one runs out
+        self.boot_bag = ShuffleBag(self.lore_data.get("boot_sequence", []))
+        self.idle_bag = ShuffleBag(self.lore_data.get("idle_logs", []))
 
-        # Shuffle them immediately upon app start
-        random.shuffle(self.boot_bag)
-        random.shuffle(self.idle_bag)
+    @property
+    def milestones(self):
+        # Built on first use, so startup never touches the milestone section
+        if self._milestones is None:
+            self._milestones = MilestoneIndex(self.lore_data.get("milestones", []))
+        return self._milestones
 
     def _load_lore(self):
         try:
@@ -27,6 +60,12 @@ class FlightComputer:
             base_dir = os.path.dirname(os.path.abspath(__file__))
             file_path = os.path.join(base_dir, "lore_data.json")
 
+            try:
+                # Compiled copy (lore.py): only its section table is read now, items on demand
+                return load_lore(file_path)
+            except (OSError, ValueError) as e:
+                print(f"Compiled lore unavailable, reading JSON: {e}")
+
             with open(file_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except Exception as e:
@@ -36,13 +75,7 @@ class FlightComputer:
 
     def calculate_progress(self):
         total_km = self.db.get_total_distance()
-        milestones = self.lore_data.get("milestones", [])
-
-        next_target = None
-        for m in milestones:
-            if m["distance"] > total_km:
-                next_target = m
-                break
+        next_target = self.milestones.next_target(total_km)
 
         if not next_target:
             next_target = {"name": "UNKNOWN_SECTOR", "distance": total_km + 1000000}
@@ -55,11 +88,18 @@ class FlightComputer:
             "remaining": remaining
         }
 
-    def convert_seconds_to_km(self, seconds):
-        km = int(seconds * self.km_per_second)
-        self.db.add_distance(km)
+    def convert_seconds_to_km(self, seconds, task_id=None):
+        km, _ = self.travel(seconds, task_id)
         return km
 
+    def travel(self, seconds, task_id=None):
+        # Adds the distance for `seconds` of work (booked to task_id in the ledger);
+        # returns (km, milestones crossed on the way)
+        km = int(seconds * self.km_per_second)
+        old_km = self.db.get_total_distance()
+        self.db.add_distance(km, task_id)
+        return km, self.milestones.crossed(old_km, old_km + km)
+
     def get_console_message(self, event_type="idle"):
         # 1. Check for Holidays
         today = datetime.now().strftime("%m-%d")
@@ -73,15 +113,7 @@ class FlightComputer:
 
         # 2. Smart Selection (Shuffle Bag)
         if event_type == "boot":
-            if not self.boot_bag:
-                # Refill if empty
-                self.boot_bag = list(self.lore_data.get("boot_sequence", []))
-                random.shuffle(self.boot_bag)
-            return self.boot_bag.pop()
+            return self.boot_bag.next()
 
         else:  # idle
-            if not self.idle_bag:
-                # Refill if empty
-                self.idle_bag = list(self.lore_data.get("idle_logs", []))
-                random.shuffle(self.idle_bag)
-            return self.idle_bag.pop()
\ No newline at end of file
+            return self.idle_bag.next()
\ No newline at end of file
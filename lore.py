@@ -0,0 +1,226 @@
+import json
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+from collections.abc import Mapping, Sequence
+
+# --- COMPILED LORE FORMAT ---
+# lore_data.json compiled into one file that is mmapped and read on demand:
+#   header:   MAGIC, section count
+#   sections: name, kind, item count, offsets position, blob position, blob length
+#   per section: (count + 1) little-endian u64 offsets into its blob, then the UTF-8 blob itself
+# Opening the file only reads the section table; an item is decoded when it is asked for.
+MAGIC = b"TMLORE01"
+HEADER = struct.Struct("<8sI")
+SECTION = struct.Struct("<24sBIQQQ")
+OFFSET = struct.Struct("<Q")
+
+KIND_TEXT = 0  # list of strings
+KIND_RECORDS = 1  # list of JSON values (milestones)
+KIND_MAP = 2  # dict: items are key, value, key, value... with keys sorted by their UTF-8 bytes
+KIND_VALUE = 3  # anything else, stored as a single JSON item
+
+
+def _encode_section(value):
+    if isinstance(value, list):
+        if all(isinstance(v, str) for v in value):
+            return KIND_TEXT, len(value), [v.encode("utf-8") for v in value]
+        return KIND_RECORDS, len(value), [json.dumps(v, ensure_ascii=False).encode("utf-8") for v in value]
+    if isinstance(value, dict):
+        items = []
+        for key in sorted(value, key=lambda k: str(k).encode("utf-8")):
+            items.append(str(key).encode("utf-8"))
+            items.append(json.dumps(value[key], ensure_ascii=False).encode("utf-8"))
+        return KIND_MAP, len(value), items
+    return KIND_VALUE, 1, [json.dumps(value, ensure_ascii=False).encode("utf-8")]
+
+
+def compile_lore(json_path, bin_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    name_size = SECTION.size - struct.calcsize("<BIQQQ")
+    for name in data:
+        # The table stores names in a fixed NUL-padded field; a longer name would be cut short silently
+        if len(name.encode("utf-8")) > name_size or "\0" in name:
+            raise ValueError(f"lore section name {name!r} must be at most {name_size} UTF-8 bytes, without NULs")
+
+    sections = [(name, *_encode_section(value)) for name, value in data.items()]
+    table_end = HEADER.size + SECTION.size * len(sections)
+    table, body = [], []
+    pos = table_end
+    for name, kind, count, items in sections:
+        offsets, blob_len = [0], 0
+        for item in items:
+            blob_len += len(item)
+            offsets.append(blob_len)
+        offsets_pos = pos
+        blob_pos = offsets_pos + OFFSET.size * len(offsets)
+        table.append(SECTION.pack(name.encode("utf-8"), kind, count, offsets_pos, blob_pos, blob_len))
+        body.append(struct.pack(f"<{len(offsets)}Q", *offsets))
+        body.append(b"".join(items))
+        pos = blob_pos + blob_len
+
+    # Written next to the target and swapped in, so a reader never sees a half-written file
+    tmp_path = bin_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(sections)))
+        f.writelines(table)
+        f.writelines(body)
+    os.replace(tmp_path, bin_path)
+    return {name: count for name, _, count, _ in sections}
+
+
+# --- LAZY READER ---
+class _Items:
+    def __init__(self, buf, count, offsets_pos, blob_pos):
+        self.buf = buf
+        self.count = count
+        self.offsets_pos = offsets_pos
+        self.blob_pos = blob_pos
+
+    def raw(self, i):
+        start = OFFSET.unpack_from(self.buf, self.offsets_pos + OFFSET.size * i)[0]
+        end = OFFSET.unpack_from(self.buf, self.offsets_pos + OFFSET.size * (i + 1))[0]
+        return self.buf[self.blob_pos + start:self.blob_pos + end]
+
+
+class LoreText(Sequence):
+    """Read-only list view over a compiled section; items are decoded on access and never cached."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def __len__(self):
+        return self.items.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError("lore index out of range")
+        return self._decode(self.items.raw(i))
+
+    def _decode(self, raw):
+        return raw.decode("utf-8")
+
+
+class LoreRecords(LoreText):
+    def _decode(self, raw):
+        return json.loads(raw)
+
+
+class LoreMap(Mapping):
+    """Read-only dict view; lookups binary-search the sorted keys in place."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def __len__(self):
+        return self.items.count
+
+    def __iter__(self):
+        return (self.items.raw(2 * i).decode("utf-8") for i in range(self.items.count))
+
+    def __getitem__(self, key):
+        target = str(key).encode("utf-8")
+        lo, hi = 0, self.items.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self.items.raw(2 * mid)
+            if probe == target:
+                return json.loads(self.items.raw(2 * mid + 1))
+            if probe < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        raise KeyError(key)
+
+
+class LoreFile:
+    """A compiled lore file, mmapped. get() mirrors dict.get() on the parsed JSON, but hands back lazy views."""
+
+    VIEWS = {KIND_TEXT: LoreText, KIND_RECORDS: LoreRecords, KIND_MAP: LoreMap}
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, section_count = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            self.buf.close()
+            raise ValueError(f"{path} is not a compiled lore file")
+        self.sections = {}
+        for i in range(section_count):
+            name, kind, count, offsets_pos, blob_pos, _ = SECTION.unpack_from(self.buf, HEADER.size + SECTION.size * i)
+            self.sections[name.rstrip(b"\0").decode("utf-8")] = (kind, count, offsets_pos, blob_pos)
+        self.views = {}
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def get(self, name, default=None):
+        if name not in self.sections: return default
+        if name not in self.views:
+            kind, count, offsets_pos, blob_pos = self.sections[name]
+            items = _Items(self.buf, count, offsets_pos, blob_pos)
+            view = self.VIEWS.get(kind)
+            self.views[name] = view(items) if view else json.loads(items.raw(0))
+        return self.views[name]
+
+    def close(self):
+        self.buf.close()
+
+
+def load_lore(json_path):
+    # Uses <name>.bin next to the JSON, (re)compiling it first when the JSON is newer
+    bin_path = os.path.splitext(json_path)[0] + ".bin"
+    if os.path.exists(json_path):
+        if not os.path.exists(bin_path) or os.path.getmtime(bin_path) < os.path.getmtime(json_path):
+            compile_lore(json_path, bin_path)
+    return LoreFile(bin_path)
+
+
+# --- RANDOM PICKS ---
+class ShuffleBag:
+    """Hands out every item of a sequence once per round, in random order, without copying the sequence.
+
+    Each round walks the affine permutation i -> (a * i + b) % n with a coprime to n, so a round only
+    costs two random numbers whatever the size of the list.
+    """
+
+    def __init__(self, items, rng=random):
+        self.items = items
+        self.rng = rng
+        self._new_round()
+
+    def _new_round(self):
+        n = len(self.items)
+        self.pos = 0
+        self.b = self.rng.randrange(n) if n else 0
+        self.a = 1
+        if n > 2:
+            self.a = self.rng.randrange(1, n)
+            while math.gcd(self.a, n) != 1:
+                self.a = self.rng.randrange(1, n)
+
+    def next(self):
+        n = len(self.items)
+        if not n: raise IndexError("pick from an empty bag")
+        if self.pos >= n:
+            self._new_round()
+        i = (self.a * self.pos + self.b) % n
+        self.pos += 1
+        return self.items[i]
+
+
+if __name__ == "__main__":
+    # python3 lore.py [lore_data.json] [lore_data.bin]
+    src = sys.argv[1] if len(sys.argv) > 1 else "lore_data.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".bin"
+    counts = compile_lore(src, dst)
+    print(f"✅ Compiled '{src}' -> '{dst}' ({os.path.getsize(dst):,} bytes)")
+    for name, count in counts.items():
+        print(f"   {name}: {count}")
@@ -1,13 +1,21 @@
+from startup_profiler import STARTUP  # first, so the import timing below covers everything else
 import customtkinter as ctk
 import tkinter as tk
+import bisect
 from datetime import datetime, timedelta
 from database import TodoDatabase
+from animation import FrameGovernor, GlyphRing, coords_script, fall_path
+from db_worker import DatabaseWorker
+from scheduler import PRIORITY_COSMETIC, TickScheduler
 from gamification import FlightComputer
-from tkinter import messagebox
+from reports import ReportProgress, format_seconds, project_report_lines, stream_report, week_report_lines
+from tkinter import filedialog, messagebox
 import random
 import time
 import logging
 
+STARTUP.mark("imports")
+
 # --- 1. LOGGING SETUP ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("MarioSys")
@@ -33,10 +41,23 @@ THEME = {
 # --- LAYOUT CONFIGURATION ---
 BORDER_PAD = 60
 
+# --- ARCHIVE SEARCH ---
+SEARCH_DEBOUNCE_MS = 250  # typing pause before the archive search runs
+SEARCH_RESULT_LIMIT = 200
+ARCHIVE_PAGE_SIZE = 100  # archive rows fetched per page as the list scrolls
+
+# --- ARCHIVE TIERING ---
+ARCHIVE_COLD_AFTER_DAYS = 180  # archived trees finished this long ago move to the cold file (see compact_archive)
+ARCHIVE_TIERING_MS = 6 * 60 * 60 * 1000
+LEDGER_COMPACT_AFTER_DAYS = 90  # distance ledger days older than this fold into one checkpoint per task
+LEDGER_COMPACTION_MS = 24 * 60 * 60 * 1000
+
 
 # --- BACKGROUND COMPONENT: MATRIX RAIN ---
 class MatrixRainLite(ctk.CTkCanvas):
-    def __init__(self, master, width, height, pad_size, **kwargs):
+    FRAME_MS = 200
+
+    def __init__(self, master, width, height, pad_size, scheduler, frame_budget_ms=4, **kwargs):
         super().__init__(master, width=width, height=height, **kwargs)
         self.configure(bg="black", highlightthickness=0)
         self.width = width
@@ -45,76 +66,83 @@ class MatrixRainLite(ctk.CTkCanvas):
         self.font_size = 14
         self.font_family = "Consolas"
         self.col_spacing = int(self.font_size * 15)
-        self.cols = int(self.width // self.col_spacing)
-        self.drops = []
         self.chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ@#$%^&*"
-        self._init_drops()
-        self.running = True
-        self.animate()
+        self.glyphs = GlyphRing(self.chars, random)
+        # Frame timing lives here: bg_matrix.governor.stats() shows per-frame cost against the budget
+        self.governor = FrameGovernor(self.FRAME_MS, budget_ms=frame_budget_ms)
+        # Item pool, one per column: sized for the whole screen up front and never deleted. Resizes only
+        # show/hide the tail, so a running app doesn't churn canvas items or strings.
+        self.drops = []
+        self.cols = 0
+        self._grow_pool(max(self.cols_for(width), self.cols_for(self.winfo_screenwidth())))
+        self._set_columns(self.cols_for(width))
+        scheduler.every("matrix_rain", self.FRAME_MS, self.animate, priority=PRIORITY_COSMETIC, cosmetic=True,
+                        delay_ms=0)
         self.bind("<Configure>", self._on_resize)
 
-    def _init_drops(self):
-        self.drops = []
-        for i in range(self.cols):
-            stream_len = random.randint(3, 8)
-            stream_text = "\n".join([random.choice(self.chars) for _ in range(stream_len)])
+    def cols_for(self, width):
+        return int(width // self.col_spacing)
+
+    def _grow_pool(self, count):
+        # Each drop: [item, x, speed, path, phase]; path is its precomputed y per frame, phase the current index
+        for i in range(len(self.drops), count):
             x = i * self.col_spacing
             y = random.randint(-self.height, 0)
             speed = random.randint(3, 10)
-            tag = self.create_text(x, y, text=stream_text, fill=THEME["DIM"], anchor="nw",
-                                   font=(self.font_family, self.font_size))
-            self.drops.append([tag, speed, y, x])
+            item = self.create_text(x, y, text=self.glyphs.next(), fill=THEME["DIM"], anchor="nw",
+                                    font=(self.font_family, self.font_size), state="hidden")
+            self.drops.append([item, x, speed, self._path_for(x, y, speed), 0])
+
+    def _set_columns(self, cols):
+        if cols > len(self.drops):
+            self._grow_pool(cols)  # Only when the window outgrows the screen it started on
+        if cols == self.cols: return
+        low, high = sorted((self.cols, cols))
+        state = "normal" if cols > self.cols else "hidden"
+        self.tk.eval("\n".join(f"{self._w} itemconfigure {self.drops[i][0]} -state {state}"
+                                for i in range(low, high)))
+        for drop in self.drops[self.cols:cols]:
+            # Re-entering columns start a fresh fall from above
+            item, x, speed, _, _ = drop
+            drop[3], drop[4] = self._path_for(x, random.randint(-self.height, 0), speed), 0
+        self.cols = cols
+
+    def _path_for(self, x, start_y, speed):
+        # Columns behind the app window skip straight past it
+        gap = None
+        if self.pad_size < x < self.width - self.pad_size:
+            gap = (self.pad_size, self.height - self.pad_size)
+        return fall_path(start_y, speed, self.height, gap)
 
     def _on_resize(self, event):
         self.width = event.width
         self.height = event.height
-        if abs(len(self.drops) - (self.width // self.col_spacing)) > 5:
-            self.delete("all")
-            self.cols = int(self.width // self.col_spacing)
-            self._init_drops()
+        # Same drops, new geometry: re-plan each visible path from where the drop is now
+        for drop in self.drops[:self.cols]:
+            item, x, speed, path, phase = drop
+            drop[3], drop[4] = self._path_for(x, path[phase], speed), 0
+        self._set_columns(self.cols_for(self.width))
 
     def animate(self):
-        if not self.running: return
-        app_left = self.pad_size
-        app_right = self.width - self.pad_size
-        app_top = self.pad_size
-        app_bottom = self.height - self.pad_size
-
-        for drop in self.drops:
-            tag_id, speed, current_y, col_x = drop
-            is_middle_col = (app_left < col_x < app_right)
-            if is_middle_col:
-                next_y = current_y + speed
-                if current_y < app_top and next_y >= app_top:
-                    jump_dist = app_bottom - current_y
-                    self.move(tag_id, 0, jump_dist)
-                    drop[2] = app_bottom
-                elif app_top <= current_y < app_bottom:
-                    jump_dist = app_bottom - current_y
-                    self.move(tag_id, 0, jump_dist)
-                    drop[2] = app_bottom
-                else:
-                    self.move(tag_id, 0, speed)
-                    drop[2] += speed
-            else:
-                self.move(tag_id, 0, speed)
-                drop[2] += speed
-
-            if drop[2] > self.height:
-                reset_y = -random.randint(50, 200)
-                delta_y = reset_y - drop[2]
-                self.move(tag_id, 0, delta_y)
-                drop[2] = reset_y
-        self.after(200, self.animate)
+        # Scheduled as "matrix_rain"; the return value is the governor's next frame interval
+        steps = self.governor.begin_frame()  # > 1 when the loop lagged: skip ahead instead of replaying
+        moves = []
+        for i in range(self.cols):
+            drop = self.drops[i]
+            item, x, speed, path, phase = drop
+            phase += steps
+            if phase >= len(path):
+                path = drop[3] = self._path_for(x, -random.randint(50, 200), speed)
+                phase = 0
+                self.itemconfigure(item, text=self.glyphs.next())
+            drop[4] = phase
+            moves.append((item, x, path[phase]))
+        if moves:
+            self.tk.eval(coords_script(self._w, moves))
+        return self.governor.end_frame()
 
 
 # --- HELPER FUNCTIONS ---
-def format_seconds(seconds):
-    m, s = divmod(int(seconds), 60)
-    h, m = divmod(m, 60)
-    return f"{h:02d}:{m:02d}:{s:02d}"
-
-
 def format_short_date(date_str):
     if not date_str: return ""
     dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
@@ -279,81 +307,39 @@ class ActionDialog(ctk.CTkToplevel):
 
 
 # --- NEW: MAP LOG WINDOW ---
-class MapLogWindow(ctk.CTkToplevel):
-    def __init__(self, parent, flight_computer):
-        super().__init__(parent)
-        self.title("NAV_CHART // MISSION_LOG")
-        self.geometry("600x700")
-        self.configure(fg_color="black")
-        self.fc = flight_computer
-        self.transient(parent)
-
-        # Header
-        ctk.CTkLabel(self, text="MISSION MANIFEST", font=THEME["FONT_HEADER"], text_color=THEME["FG"]).pack(pady=20)
-
-        # Scrollable Container
-        self.scroll = ctk.CTkScrollableFrame(self, fg_color="transparent")
-        self.scroll.pack(fill="both", expand=True, padx=20, pady=10)
-
-        self.render_map()
-
-    def render_map(self):
-        current_km = self.fc.db.get_total_distance()
-        milestones = self.fc.lore_data.get("milestones", [])
-
-        # Sort by distance just in case
-        milestones.sort(key=lambda x: x["distance"])
-
-        # Identify next target index
-        next_target_index = -1
-        for i, m in enumerate(milestones):
-            if m["distance"] > current_km:
-                next_target_index = i
-                break
-
-        for i, m in enumerate(milestones):
-            is_reached = m["distance"] <= current_km
-            is_active = (i == next_target_index)
-
-            self.create_mission_card(m, is_reached, is_active)
-
-    def create_mission_card(self, m, is_reached, is_active):
-        # Card Colors
-        if is_reached:
-            border_col = THEME["FG"]  # Green
-            title_col = THEME["FG"]
-            status_text = "[ MISSION ACCOMPLISHED ]"
-        elif is_active:
-            border_col = "#FF2222"  # Vivid Red
-            title_col = "#FF2222"
-            status_text = "[ >> CURRENT OBJECTIVE << ]"
-        else:
-            border_col = "#333"  # Dim Grey
-            title_col = "#555"
-            status_text = "[ LOCKED // FUTURE TARGET ]"
-
-        card = ctk.CTkFrame(self.scroll, fg_color="#050505", border_color=border_col, border_width=1, corner_radius=0)
-        card.pack(fill="x", pady=10)
+class MissionCard(ctk.CTkFrame):
+    # Card look per state: (border/status colour, title colour, lore colour, status text)
+    STYLES = {
+        "reached": (THEME["FG"], THEME["FG"], THEME["FG"], "[ MISSION ACCOMPLISHED ]"),
+        "active": ("#FF2222", "#FF2222", "#FF2222", "[ >> CURRENT OBJECTIVE << ]"),
+        "locked": ("#333", "#555", "#555", "[ LOCKED // FUTURE TARGET ]"),
+    }
+
+    def __init__(self, parent, m, state):
+        super().__init__(parent, fg_color="#050505", border_width=1, corner_radius=0)
+        self.state = None
 
         # Header Row
-        head = ctk.CTkFrame(card, fg_color="transparent")
+        head = ctk.CTkFrame(self, fg_color="transparent")
         head.pack(fill="x", padx=10, pady=5)
 
         name = m["name"].replace("_", " ")
         dist_str = f"{m['distance']:,} KM"
 
-        ctk.CTkLabel(head, text=name, font=("Consolas", 14, "bold"), text_color=title_col).pack(side="left")
-        ctk.CTkLabel(head, text=dist_str, font=("Consolas", 12), text_color=border_col).pack(side="right")
+        self.name_label = ctk.CTkLabel(head, text=name, font=("Consolas", 14, "bold"))
+        self.name_label.pack(side="left")
+        self.dist_label = ctk.CTkLabel(head, text=dist_str, font=("Consolas", 12))
+        self.dist_label.pack(side="right")
 
         # Status Bar
-        ctk.CTkLabel(card, text=status_text, font=("Consolas", 10, "bold"), text_color=border_col, anchor="w").pack(
-            fill="x", padx=10)
+        self.status_label = ctk.CTkLabel(self, font=("Consolas", 10, "bold"), anchor="w")
+        self.status_label.pack(fill="x", padx=10)
 
         # Separator
-        ctk.CTkFrame(card, height=1, fg_color="#222").pack(fill="x", padx=10, pady=5)
+        ctk.CTkFrame(self, height=1, fg_color="#222").pack(fill="x", padx=10, pady=5)
 
         # Body Content
-        body = ctk.CTkFrame(card, fg_color="transparent")
+        body = ctk.CTkFrame(self, fg_color="transparent")
         body.pack(fill="x", padx=10, pady=(0, 10))
 
         # Fact (Intel)
@@ -365,50 +351,161 @@ class MapLogWindow(ctk.CTkToplevel):
         # Lore (Mission)
         ctk.CTkLabel(body, text="MISSION_BRIEF:", font=("Consolas", 10, "bold"), text_color="#888", anchor="w").pack(
             fill="x")
-        # Lore Text color depends on status
-        lore_col = THEME["FG"] if is_reached else ("#FF2222" if is_active else "#555")
+        self.lore_label = ctk.CTkLabel(body, text=m.get("mission_log", "Classified"), font=("Consolas", 11, "italic"),
+                                       wraplength=500, justify="left", anchor="w")
+        self.lore_label.pack(fill="x")
+
+        self.set_state(state)
 
-        ctk.CTkLabel(body, text=m.get("mission_log", "Classified"), font=("Consolas", 11, "italic"),
-                     text_color=lore_col, wraplength=500, justify="left", anchor="w").pack(fill="x")
+    def set_state(self, state):
+        # Only colours and the status line depend on progress; the rest of the card never changes
+        if state == self.state: return
+        self.state = state
+        border_col, title_col, lore_col, status_text = self.STYLES[state]
+        self.configure(border_color=border_col)
+        self.name_label.configure(text_color=title_col)
+        self.dist_label.configure(text_color=border_col)
+        self.status_label.configure(text=status_text, text_color=border_col)
+        self.lore_label.configure(text_color=lore_col)
+
+
+class MapLogWindow(ctk.CTkToplevel):
+    # Built once and kept: closing only hides it, and TodoApp.open_map_log shows it again with set_km()
+    BATCH = 6  # cards built per step as the list scrolls
+
+    def __init__(self, parent, flight_computer, current_km, scheduler):
+        super().__init__(parent)
+        self.title("NAV_CHART // MISSION_LOG")
+        self.geometry("600x700")
+        self.configure(fg_color="black")
+        self.fc = flight_computer
+        self.scheduler = scheduler
+        self.current_km = current_km
+        self.next_index = self.fc.milestones.next_index(current_km)
+        self.cards = []  # built cards, in milestone order
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+        # Header
+        ctk.CTkLabel(self, text="MISSION MANIFEST", font=THEME["FONT_HEADER"], text_color=THEME["FG"]).pack(pady=20)
+
+        # Scrollable Container
+        self.scroll = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        self.scroll.pack(fill="both", expand=True, padx=20, pady=10)
+        # Watch the scroll position: more cards are built as the view nears the end of what exists
+        canvas, scrollbar = self.scroll._parent_canvas, self.scroll._scrollbar
+        canvas.configure(yscrollcommand=lambda first, last: [scrollbar.set(first, last), self._on_scrolled(last)])
+
+        self.render_map()
+
+    def render_map(self):
+        self._build_more()
+
+    def _state_for(self, i):
+        if i < self.next_index: return "reached"
+        return "active" if i == self.next_index else "locked"
+
+    def _build_more(self):
+        milestones = self.fc.milestones  # already sorted by distance
+        start = len(self.cards)
+        for i in range(start, min(start + self.BATCH, len(milestones))):
+            card = MissionCard(self.scroll, milestones.milestones[i], self._state_for(i))
+            card.pack(fill="x", pady=10)
+            self.cards.append(card)
+
+    def _on_scrolled(self, last):
+        # yscrollcommand fires many times per scroll; the keyed job coalesces them into one batch
+        if float(last) > 0.9 and len(self.cards) < len(self.fc.milestones):
+            self.scheduler.once("maplog_more", 0, self._build_more)
+
+    def set_km(self, current_km):
+        # Only cards between the old and new "next target" can change state
+        self.current_km = current_km
+        old_next, self.next_index = self.next_index, self.fc.milestones.next_index(current_km)
+        low, high = sorted((old_next, self.next_index))
+        for i in range(low, min(high + 1, len(self.cards))):
+            self.cards[i].set_state(self._state_for(i))
+
+
+# --- SCHEDULER DEBUG VIEW (F12) ---
+class SchedulerDebugWindow(ctk.CTkToplevel):
+    def __init__(self, parent, scheduler):
+        super().__init__(parent)
+        self.title("SYS_MONITOR // SCHEDULER")
+        self.geometry("640x260")
+        self.configure(fg_color="black")
+        self.scheduler = scheduler
+        self.transient(parent)
+
+        self.text = ctk.CTkTextbox(self, fg_color="black", text_color=THEME["FG"], font=THEME["FONT_MONO"])
+        self.text.pack(fill="both", expand=True, padx=10, pady=10)
+
+        scheduler.every("scheduler_debug", 1000, self.refresh, delay_ms=0)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def refresh(self):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", self.scheduler.describe())
+        self.text.configure(state="disabled")
+
+    def close(self):
+        self.scheduler.cancel("scheduler_debug")
+        self.destroy()
 
 
 # --- NEW: TYPEWRITER LABEL ---
 class TypewriterLabel(ctk.CTkLabel):
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, scheduler, **kwargs):
         super().__init__(master, text="", **kwargs)
+        self.scheduler = scheduler
+        self.job_name = f"typewriter{self._w}"  # one job per label: typing, then blinking, never both
         self.full_text = ""
         self.current_index = 0
         self.typing_speed = 50  # ms
+        self.hold_ms = 2500  # how long a finished message stays up before the next queued one
+        self.cursor_visible = True
+        self.pending = []
 
     def type_message(self, message):
+        # Interrupts whatever is on screen; queued messages follow once this one is done
         self.full_text = message
         self.current_index = 0
         self.configure(text="> ")
-        self._type_next_char()
+        self.scheduler.every(self.job_name, self.typing_speed, self._type_next_char, delay_ms=0)
 
     def _type_next_char(self):
         if self.current_index < len(self.full_text):
             current_display = "> " + self.full_text[:self.current_index + 1] + "_"
             self.configure(text=current_display)
             self.current_index += 1
-            self.after(self.typing_speed, self._type_next_char)
+        elif self.pending:
+            # Done typing, hold it, then move on to the next queued message
+            self.configure(text="> " + self.full_text + "_")
+            self.scheduler.once(self.job_name, self.hold_ms, lambda: self.type_message(self.pending.pop(0)))
         else:
-            # Done typing, blink cursor
-            self.configure(text="> " + self.full_text + " ")
-            self._blink_cursor(True)
-
-    def _blink_cursor(self, visible):
-        if self.current_index < len(self.full_text): return  # Stop blink if new type started
-        txt = "> " + self.full_text + ("_" if visible else " ")
+            # Done typing, blink cursor (replaces the typing job)
+            self.cursor_visible = True
+            self.scheduler.every(self.job_name, 800, self._blink_cursor, priority=PRIORITY_COSMETIC,
+                                 cosmetic=True, delay_ms=0)
+
+    def queue_messages(self, messages):
+        self.pending.extend(messages)
+        if self.pending and self.current_index >= len(self.full_text):
+            self.type_message(self.pending.pop(0))
+
+    def _blink_cursor(self):
+        txt = "> " + self.full_text + ("_" if self.cursor_visible else " ")
         self.configure(text=txt)
-        self.after(800, lambda: self._blink_cursor(not visible))
+        self.cursor_visible = not self.cursor_visible
 
 
 # --- NEW: FLIGHT DECK WIDGET (UPDATED) ---
 class FlightDeck(ctk.CTkFrame):
-    def __init__(self, parent, flight_computer):
+    def __init__(self, parent, flight_computer, db_worker, scheduler):
         super().__init__(parent, fg_color="transparent", border_width=0, corner_radius=0)
         self.fc = flight_computer
+        self.db_worker = db_worker
 
         # Row 1: Metrics
         self.metrics_frame = ctk.CTkFrame(self, fg_color="#050505", border_color=THEME["DIM"], border_width=1,
@@ -440,14 +537,16 @@ class FlightDeck(ctk.CTkFrame):
             side="left", padx=(10, 5))
 
         # Typing Text - YELLOW/GOLD
-        self.comm_label = TypewriterLabel(self.comm_frame, font=("Consolas", 12), text_color="#f1c40f", anchor="w")
+        self.comm_label = TypewriterLabel(self.comm_frame, scheduler, font=("Consolas", 12), text_color="#f1c40f",
+                                          anchor="w")
         self.comm_label.pack(side="left", fill="x", expand=True, padx=5, pady=2)
 
         # Start Clock
-        self.update_clock()
+        scheduler.every("clock", 1000, self.update_clock, delay_ms=0)
         self.update_nav_data()
 
-        # Boot Message
+    def start(self):
+        # Boot Message (started by TodoApp once the window has painted)
         msg = self.fc.get_console_message("boot")
         self.comm_label.type_message(msg)
 
@@ -455,10 +554,12 @@ class FlightDeck(ctk.CTkFrame):
         # Format: 14:32:05 31/12/2025
         now_str = datetime.now().strftime("%H:%M:%S %d/%m/%Y")
         self.clock_label.configure(text=f"T-ACT: {now_str}")
-        self.after(1000, self.update_clock)
 
     def update_nav_data(self):
-        data = self.fc.calculate_progress()
+        # Odometer read happens on the DB worker; the labels update when it comes back
+        self.db_worker.submit_read(self.fc.calculate_progress, key="nav", on_done=self.show_nav_data)
+
+    def show_nav_data(self, data):
         self.target_label.configure(text=f"TARGET: {data['target_name']} (-{data['remaining']:,} KM)")
         self.odo_label.configure(text=f"ODOMETER: {data['total']:,} KM")
 
@@ -467,61 +568,57 @@ class FlightDeck(ctk.CTkFrame):
             txt = self.fc.get_console_message("idle")
         self.comm_label.type_message(txt)
 
+    def announce_milestones(self, milestones):
+        logs = [f"WAYPOINT REACHED: {m['name'].replace('_', ' ')} // {m.get('mission_log', '')}" for m in milestones]
+        self.comm_label.type_message(logs[0])
+        self.comm_label.queue_messages(logs[1:])
+
 
 # --- TASK WIDGET ---
 class TaskWidget(ctk.CTkFrame):
+    # Row widgets are built once and re-bound in place, so a pooled row can show any task
+    _done_font = None
+
     def __init__(self, parent, task_data, db, reload_callback, toggle_fold_callback, app_reference, is_folded=False,
                  depth=0,
                  is_history=False, has_children=False):
         super().__init__(parent, fg_color="transparent", border_width=0, corner_radius=0)
-        self.pack(fill="x", pady=2, padx=(depth * 25 + 5, 5))
         self.inner = ctk.CTkFrame(self, fg_color="transparent", border_color=THEME["DIM"], border_width=1,
                                   corner_radius=0)
         self.inner.pack(fill="both", expand=True)
 
         self.db = db
-        self.task_data = task_data
         self.reload_callback = reload_callback
         self.toggle_fold_callback = toggle_fold_callback
         self.app_reference = app_reference
-        self.task_id = task_data['id']
         self.is_history = is_history
-        self.status = task_data['status']
+        self.render_key = None
+        if TaskWidget._done_font is None:
+            TaskWidget._done_font = ctk.CTkFont(family="Consolas", size=13, overstrike=True)
+
+        self._build()
+        self.update_task(task_data, is_folded, depth, has_children)
 
+    def _build(self):
         # Indent Arrow
-        if depth > 0:
-            ctk.CTkLabel(self.inner, text="↳", text_color=THEME["DIM"], font=THEME["FONT_MONO"], width=20).pack(
-                side="left", padx=(5, 0))
+        self.indent_label = ctk.CTkLabel(self.inner, text="↳", text_color=THEME["DIM"], font=THEME["FONT_MONO"],
+                                         width=20)
 
         # Status & Name
-        if self.status == 'COMPLETED':
-            text_color = THEME["DIM"]
-            name_font = ctk.CTkFont(family="Consolas", size=13, overstrike=True)
-            display_name = f"[DONE] {task_data['task_name']}"
-        else:
-            text_color = THEME["FG"]
-            name_font = THEME["FONT_MAIN"]
-            display_name = f"> {task_data['task_name']}"
-
-        info_frame = ctk.CTkFrame(self.inner, fg_color="transparent")
-        info_frame.pack(side="left", padx=5, expand=True, fill="x")
-        ctk.CTkLabel(info_frame, text=display_name, font=name_font, text_color=text_color, anchor="w").pack(fill="x")
+        self.info_frame = ctk.CTkFrame(self.inner, fg_color="transparent")
+        self.name_label = ctk.CTkLabel(self.info_frame, text="", anchor="w")
+        self.name_label.pack(fill="x")
 
         # Meta Data
-        created_str = format_short_date(task_data['created_at'])
-        date_text = f"ID:{self.task_id} | Init: {created_str}"
-        if task_data['due_date']: date_text += f" | ETA: {task_data['due_date']}"
-        ctk.CTkLabel(info_frame, text=date_text, font=("Consolas", 10), text_color=THEME["DIM"], anchor="w").pack(
-            fill="x")
+        self.meta_label = ctk.CTkLabel(self.info_frame, text="", font=("Consolas", 10), text_color=THEME["DIM"],
+                                       anchor="w")
+        self.meta_label.pack(fill="x")
 
         # --- RIGHT SIDE BUTTONS ---
         # Order: [ + ] [ KILL ] [ i ] [ ≡ ] [ ▶ ] [ RUN ] 00:00:00
 
         # 7. Timer Label (Rightmost)
-        self.time_str = format_seconds(task_data['time_spent'])
-        timer_color = "#3498db" if task_data['current_session_start'] else text_color
-        self.timer_label = ctk.CTkLabel(self.inner, text=self.time_str, width=80, text_color=timer_color,
-                                        font=("Consolas", 14, "bold"))
+        self.timer_label = ctk.CTkLabel(self.inner, text="", width=80, font=("Consolas", 14, "bold"))
         self.timer_label.pack(side="right", padx=10)
 
         # Helper for Button Creation
@@ -530,54 +627,115 @@ class TaskWidget(ctk.CTkFrame):
                                  border_width=1, border_color=color, text_color=color,
                                  hover_color="#222", corner_radius=0, font=("Consolas", 11, "bold"), command=cmd)
 
-        if not is_history and self.status != 'COMPLETED':
-            # 6. [ RUN ] / [ STOP ]
+        if not self.is_history:
+            self.run_btn = btn("RUN", self.start_task)  # 6. [ RUN ] / [ STOP ]
+            self.fold_btn = btn("▼", self.toggle_fold)  # 5. [ ▶ ] / [ ▼ ] (Toggle Fold)
+            self.menu_btn = btn("≡", self.open_action_menu, width=30)  # 4. [ ≡ ] (Menu)
+            self.note_btn = btn("[ i ]", self.open_notes, color="#444")  # 3. [ i ] (Notes)
+            self.kill_btn = btn("KILL", self.mark_done)  # 2. [ KILL ] (Mark Done)
+            self.add_btn = btn("+", self.add_subtask)  # 1. [ + ] (Add Subtask)
+            self.undo_btn = btn("[UNDO]", self.reopen_task, color="#666")
+        else:
+            self.reopen_btn = btn("[REOPEN]", self.reopen_task, width=60)
+        self.packed_buttons = []
+
+    @staticmethod
+    def make_render_key(task_data, is_folded, depth, is_history, has_children):
+        # Everything the row displays; if this is unchanged the widget can be left alone
+        fields = tuple((k, v) for k, v in task_data.items() if k != 'children')
+        return fields, is_folded, depth, is_history, has_children
+
+    def update_task(self, task_data, is_folded=False, depth=0, has_children=False):
+        # Re-binds the row in place when something visible changed. Returns True if it did.
+        render_key = self.make_render_key(task_data, is_folded, depth, self.is_history, has_children)
+        if render_key == self.render_key:
+            return False
+        self.render_key = render_key
+        self.task_data = task_data
+        self.task_id = task_data['id']
+        self.status = task_data['status']
+        self.depth = depth
+        self._apply(is_folded, depth, has_children)
+        return True
+
+    def _apply(self, is_folded, depth, has_children):
+        task_data = self.task_data
+
+        # Left side: indent arrow (only for subtasks) + info block
+        self.indent_label.pack_forget()
+        self.info_frame.pack_forget()
+        if depth > 0:
+            self.indent_label.pack(side="left", padx=(5, 0))
+        self.info_frame.pack(side="left", padx=5, expand=True, fill="x")
+
+        if self.status == 'COMPLETED':
+            text_color = THEME["DIM"]
+            name_font = TaskWidget._done_font
+            display_name = f"[DONE] {task_data['task_name']}"
+        else:
+            text_color = THEME["FG"]
+            name_font = THEME["FONT_MAIN"]
+            display_name = f"> {task_data['task_name']}"
+        self.name_label.configure(text=display_name, font=name_font, text_color=text_color)
+
+        created_str = format_short_date(task_data['created_at'])
+        date_text = f"ID:{self.task_id} | Init: {created_str}"
+        if task_data['due_date']: date_text += f" | ETA: {task_data['due_date']}"
+        self.meta_label.configure(text=date_text)
+
+        self.time_str = format_seconds(task_data['subtree_seconds'])  # whole subtree, from task_rollups
+        timer_color = "#3498db" if task_data['current_session_start'] else text_color
+        self.timer_label.configure(text=self.time_str, text_color=timer_color)
+
+        # Right side: re-pack only the buttons this state needs, in display order
+        buttons = []
+        if not self.is_history and self.status != 'COMPLETED':
             if task_data['current_session_start']:
-                btn("STOP", self.stop_task, color="red").pack(side="right", padx=2)
+                self.run_btn.configure(text="STOP", command=self.stop_task, border_color="red", text_color="red")
             else:
-                btn("RUN", self.start_task).pack(side="right", padx=2)
+                self.run_btn.configure(text="RUN", command=self.start_task, border_color=THEME["FG"],
+                                       text_color=THEME["FG"])
+            buttons.append((self.run_btn, 2))
 
-            # 5. [ ▶ ] / [ ▼ ] (Toggle Fold)
             if has_children:
-                fold_symbol = "▶" if is_folded else "▼"
-                btn(fold_symbol, self.toggle_fold).pack(side="right", padx=2)
-            else:
-                pass  # Spacer
+                self.fold_btn.configure(text="▶" if is_folded else "▼")
+                buttons.append((self.fold_btn, 2))
 
-            # 4. [ ≡ ] (Menu)
-            btn("≡", self.open_action_menu, width=30).pack(side="right", padx=(2, 5))
+            buttons.append((self.menu_btn, (2, 5)))
 
-            # 3. [ i ] (Notes)
-            has_notes = bool(task_data['notes'] and task_data['notes'].strip())
+            has_notes = bool(task_data['has_notes'])  # the note body itself is only loaded by open_notes
             note_color = "#00FF41" if has_notes else "#444"
-            note_hover = "#111"
-            if has_notes: note_hover = "#222"
+            note_hover = "#222" if has_notes else "#111"
+            self.note_btn.configure(border_color=note_color, text_color=note_color, hover_color=note_hover)
+            buttons.append((self.note_btn, 2))
 
-            note_btn = ctk.CTkButton(self.inner, text="[ i ]", width=30, height=24, fg_color="transparent",
-                                     border_width=1, border_color=note_color, text_color=note_color,
-                                     hover_color=note_hover, corner_radius=0, font=("Consolas", 11, "bold"),
-                                     command=self.open_notes)
-            note_btn.pack(side="right", padx=2)
-
-            # 2. [ KILL ] (Mark Done)
-            btn("KILL", self.mark_done).pack(side="right", padx=2)
-
-            # 1. [ + ] (Add Subtask)
+            buttons.append((self.kill_btn, 2))
             if depth < 5:
-                btn("+", self.add_subtask).pack(side="right", padx=2)
-
-        elif is_history:
-            btn("[REOPEN]", self.reopen_task, width=60).pack(side="right", padx=5)
+                buttons.append((self.add_btn, 2))
+        elif self.is_history:
+            buttons.append((self.reopen_btn, 5))
         elif self.status == 'COMPLETED':
-            btn("[UNDO]", self.reopen_task, color="#666").pack(side="right", padx=5)
+            buttons.append((self.undo_btn, 5))
 
+        if [b for b, _ in buttons] != self.packed_buttons:
+            for b in self.packed_buttons: b.pack_forget()
+            for b, padx in buttons: b.pack(side="right", padx=padx)
+            self.packed_buttons = [b for b, _ in buttons]
+
+    # Handlers hand DB work to the app's background worker; task_id is captured up front because a pooled
+    # row may be showing a different task by the time a dialog closes or the write completes.
+    # Writes to archive rows run unbatched: the task may live in the cold tier and be moved back first.
     def open_notes(self):
+        task_id = self.task_id
+
         def save_callback(new_text):
-            self.db.update_task_notes(self.task_id, new_text)
-            self.reload_callback()
+            self.app_reference.run_write(self.db.update_task_notes, task_id, new_text, batch=not self.is_history,
+                                         on_done=lambda _: self.app_reference.refresh_rows(task_id))
 
-        current_notes = self.task_data['notes'] if self.task_data['notes'] else ""
-        NotesDialog(self.winfo_toplevel(), self.task_data['task_name'], current_notes, save_callback)
+        task_name = self.task_data['task_name']
+        self.app_reference.db_worker.submit_read(
+            self.db.get_task_notes, task_id,
+            on_done=lambda notes: NotesDialog(self.winfo_toplevel(), task_name, notes, save_callback))
 
     def open_action_menu(self):
         ActionDialog(self.winfo_toplevel(), self.task_data['task_name'],
@@ -590,44 +748,41 @@ class TaskWidget(ctk.CTkFrame):
         self.app_reference.generate_task_specific_report(self.task_id)
 
     def edit_task(self):
+        task_id = self.task_id
+
         def save(n, e, _):
-            self.db.update_task_fields(self.task_id, n, e)
-            self.reload_callback()
+            self.app_reference.run_write(self.db.update_task_fields, task_id, n, e, batch=not self.is_history,
+                                         on_done=lambda _: self.app_reference.refresh_rows(task_id))
 
         TaskDialog(self.winfo_toplevel(), save, title="EDIT_TASK", initial_name=self.task_data['task_name'],
                    initial_eta=self.task_data['due_date'], include_category=False)
 
     def delete_task(self):
-        self.db.delete_task(self.task_id)
-        self.reload_callback()
+        self.app_reference.run_write(self.db.delete_task, self.task_id, batch=not self.is_history)
 
     def archive_task(self):
-        self.db.archive_task(self.task_id)
-        self.reload_callback()
+        self.app_reference.run_write(self.db.archive_task, self.task_id)
 
     def start_task(self):
-        self.db.start_timer(self.task_id)
-        self.reload_callback()
+        task_id = self.task_id
+        self.app_reference.run_write(self.db.start_timer, task_id,
+                                     on_done=lambda _: self.app_reference.refresh_rows(task_id))
 
     def stop_task(self):
         # UPDATED: Capture elapsed time and send to flight computer
-        elapsed_seconds = self.db.stop_timer(self.task_id)
-        if elapsed_seconds > 0:
-            self.app_reference.on_task_stopped(elapsed_seconds)
-        self.reload_callback()
+        self.app_reference.stop_task_timer(self.task_id)
 
     def mark_done(self):
-        self.db.mark_completed(self.task_id)
-        self.reload_callback()
+        self.app_reference.run_write(self.db.mark_completed, self.task_id)
 
     def reopen_task(self):
-        self.db.reopen_task(self.task_id)
-        self.reload_callback()
+        self.app_reference.run_write(self.db.reopen_task, self.task_id, batch=not self.is_history)
 
     def add_subtask(self):
+        task_id, category = self.task_id, self.task_data['category']
+
         def save(n, e, _):
-            self.db.add_task(n, due_date=e, category=self.task_data['category'], parent_id=self.task_id)
-            self.reload_callback()
+            self.app_reference.run_write(self.db.add_task, n, e, category, task_id)
 
         TaskDialog(self.winfo_toplevel(), save, title="SUB_TASK", include_category=False)
 
@@ -635,6 +790,165 @@ class TaskWidget(ctk.CTkFrame):
         self.toggle_fold_callback(self.task_id)
 
 
+# --- VIRTUAL TASK LIST ---
+class VirtualTaskList(ctk.CTkFrame):
+    """Windowed list: only the rows in the viewport (plus an overscan buffer) are materialized.
+
+    Rows are (key, spec) pairs where spec[0] is the row kind ("header" or "task").
+    A small pool of row widgets per kind is recycled as the user scrolls, and rows that
+    stay on screen across a refresh keep their widget, so memory and layout cost stay
+    flat no matter how many rows the snapshot holds.
+    """
+    ROW_HEIGHTS = {"header": 64, "task": 56}
+    ROW_GAP = 4
+    SCROLL_STEP = 40
+
+    def __init__(self, master, create_row, update_row, overscan=4, on_near_end=None, prefetch=20, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.create_row = create_row
+        self.update_row = update_row
+        self.overscan = overscan
+        # Called whenever the viewport comes within `prefetch` rows of the end (lists that load in pages)
+        self.on_near_end = on_near_end
+        self.prefetch = prefetch
+
+        self.rows = []
+        self.index = {}  # key -> position in self.rows
+        self.offsets = [0]  # prefix sums of row heights, in pixels
+        self.scroll_top = 0
+        self.bound = {}  # key -> slot currently showing that row
+        self.free = {}  # kind -> idle slots waiting to be recycled
+
+        self.viewport = tk.Frame(self, bg="black", highlightthickness=0)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport.bind("<Configure>", lambda e: self._layout())
+        # bind_all lives on the plain Tk viewport (CTk widgets refuse it); handlers filter by widget path
+        self.viewport.bind_all("<MouseWheel>", self._on_mouse_wheel, add="+")
+        self.viewport.bind_all("<Button-4>", self._on_mouse_wheel, add="+")
+        self.viewport.bind_all("<Button-5>", self._on_mouse_wheel, add="+")
+
+    # --- SNAPSHOT ---
+    def set_rows(self, rows):
+        self.rows = rows
+        self.index = {key: i for i, (key, _) in enumerate(rows)}
+        self.offsets = [0]
+        for _, spec in rows:
+            self.offsets.append(self.offsets[-1] + self._apply_widget_scaling(self.ROW_HEIGHTS[spec[0]]))
+        self._layout()
+
+    def append_rows(self, rows):
+        # The next page of a paged list: rows already laid out keep their offsets
+        for key, spec in rows:
+            self.index[key] = len(self.rows)
+            self.rows.append((key, spec))
+            self.offsets.append(self.offsets[-1] + self._apply_widget_scaling(self.ROW_HEIGHTS[spec[0]]))
+        self._layout()
+
+    def get_spec(self, key):
+        i = self.index.get(key)
+        return self.rows[i][1] if i is not None else None
+
+    def update_spec(self, key, spec):
+        # Single-row update: patch the snapshot and the live widget if that row is on screen
+        i = self.index.get(key)
+        if i is None: return
+        self.rows[i] = (key, spec)
+        slot = self.bound.get(key)
+        if slot is not None:
+            self.update_row(slot.row, spec)
+
+    def row_widget(self, key):
+        # The widget showing this row right now, or None if it's scrolled out of the window
+        slot = self.bound.get(key)
+        return slot.row if slot is not None else None
+
+    # --- WINDOWING ---
+    def _layout(self):
+        view_height = self.viewport.winfo_height()
+        total = self.offsets[-1]
+        self.scroll_top = max(0, min(self.scroll_top, total - view_height))
+
+        first = max(0, bisect.bisect_right(self.offsets, self.scroll_top) - 1 - self.overscan)
+        last = min(len(self.rows), bisect.bisect_left(self.offsets, self.scroll_top + view_height) + self.overscan)
+        wanted = {self.rows[i][0] for i in range(first, last)}
+
+        for key in [k for k in self.bound if k not in wanted]:
+            slot = self.bound.pop(key)
+            slot.place_forget()
+            self.free.setdefault(slot.kind, []).append(slot)
+
+        gap = self._apply_widget_scaling(self.ROW_GAP)
+        for i in range(first, last):
+            key, spec = self.rows[i]
+            slot = self.bound.get(key)
+            if slot is None:
+                slot = self._acquire(spec)
+                self.bound[key] = slot
+            else:
+                self.update_row(slot.row, spec)
+            indent = self._apply_widget_scaling(spec[2] * 25 + 5 if spec[0] == "task" else 10)
+            slot.place(x=indent, y=self.offsets[i] - self.scroll_top, relwidth=1, width=-(indent + 5),
+                       height=self.offsets[i + 1] - self.offsets[i] - gap)
+
+        if total > 0:
+            self.scrollbar.set(self.scroll_top / total, min(1.0, (self.scroll_top + view_height) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+        if self.on_near_end and last + self.prefetch - self.overscan >= len(self.rows):
+            self.on_near_end()
+
+    def _acquire(self, spec):
+        pool = self.free.get(spec[0])
+        if pool:
+            slot = pool.pop()
+            self.update_row(slot.row, spec)
+            return slot
+        slot = tk.Frame(self.viewport, bg="black", highlightthickness=0)
+        slot.kind = spec[0]
+        slot.row = self.create_row(slot, spec)
+        slot.row.pack(fill="both", expand=True)
+        return slot
+
+    # --- SCROLLING ---
+    def scroll_to(self, pixels):
+        self.scroll_top = pixels
+        self._layout()
+
+    def _on_scrollbar(self, *args):
+        view_height = self.viewport.winfo_height()
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.offsets[-1])
+        elif args[0] == "scroll":
+            step = view_height if args[2] == "pages" else self.SCROLL_STEP
+            self.scroll_to(self.scroll_top + int(args[1]) * step)
+
+    def _on_mouse_wheel(self, event):
+        if not str(event.widget).startswith(str(self.viewport)): return
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.scroll_top - self.SCROLL_STEP)
+        else:
+            self.scroll_to(self.scroll_top + self.SCROLL_STEP)
+
+
+class SectionHeader(ctk.CTkFrame):
+    def __init__(self, parent, icon, text):
+        super().__init__(parent, fg_color="transparent")
+        # Huge Icon
+        self.icon_label = ctk.CTkLabel(self, text=icon, font=THEME["FONT_SECTION_ICON"], text_color=THEME["DIM"])
+        self.icon_label.pack(side="left")
+        # Medium-Large Text (Padding Left to separate)
+        self.text_label = ctk.CTkLabel(self, text=text, font=THEME["FONT_SECTION_TEXT"], text_color=THEME["DIM"])
+        self.text_label.pack(side="left", padx=10)
+
+    def set_text(self, icon, text):
+        self.icon_label.configure(text=icon)
+        self.text_label.configure(text=text)
+
+
 # --- MAIN APP ---
 class TodoApp(ctk.CTk):
     def __init__(self):
@@ -642,25 +956,38 @@ class TodoApp(ctk.CTk):
         self.title("TEMagic_Console")
         self.geometry("1050x850")  # Increased height slightly for Flight Deck
         self.configure(fg_color="black")
-        self.db = TodoDatabase()
-        self.fc = FlightComputer(self.db)  # GAMIFICATION
+        with STARTUP.section("database (open + migrations)"):
+            self.db = TodoDatabase()
+        with STARTUP.section("lore"):
+            self.fc = FlightComputer(self.db)  # GAMIFICATION
+        self.scheduler = TickScheduler(self)  # Every timed callback (animations, clocks, DB results) runs here
+        self.db_worker = DatabaseWorker(self.db, self.scheduler)  # All DB calls run off the Tk thread
         self.folded_parents = set()
+        self.active_roots = []
+        self.task_nodes = {}  # id -> node of the last loaded active tree
+        self.running_timers = {}  # id -> (session start epoch, stored seconds) for every RUNning task on screen
+        self.map_log = None
 
         # State variables
         self.show_personal_var = ctk.BooleanVar(value=True)
         self.include_prompt_var = ctk.BooleanVar(value=True)
+        self.report_to_file_var = ctk.BooleanVar(value=False)
+        self.report_progress = None
         self.history_filter_var = ctk.StringVar(value="Current Month")
 
         # Archive Filter Default: 2 Weeks
         self.history_min_date = (datetime.now() - timedelta(weeks=2)).strftime("%Y-%m-%d %H:%M:%S")
-
-        # Layer 0: Matrix
-        self.bg_matrix = MatrixRainLite(self, width=1050, height=850, pad_size=BORDER_PAD)
-        self.bg_matrix.place(x=0, y=0, relwidth=1, relheight=1)
-        try:
-            self.bg_matrix.tk.call('lower', self.bg_matrix._w)
-        except:
-            pass
+        self.archive_query = ""  # archive search box, applied once typing pauses
+        # Archive paging: the list loads ARCHIVE_PAGE_SIZE rows at a time as it nears the bottom
+        self.archive_cursor = None  # (completed_at, id) of the last row loaded; None once the period is exhausted
+        self.archive_loaded = 0
+        self.archive_page_loading = False
+        self.archive_generation = 0  # bumped whenever the list is replaced, so late pages are dropped
+
+        # Layer 0: Matrix - created after the first paint (see _after_first_paint)
+        self.bg_matrix = None
+        self.history_built = False
+        STARTUP.mark("app state")
 
         # Layer 1: Container
         self.fg_layer = ctk.CTkFrame(self, fg_color="black", border_width=2, border_color=THEME["BORDER"],
@@ -684,18 +1011,26 @@ class TodoApp(ctk.CTk):
         head_btn("REPORT_WEEK", self.show_report_dialog)
         head_btn("MAP_LOG", self.open_map_log)  # NEW MAP LOG BUTTON
 
+        # Progress of a report being streamed on the DB worker (empty when idle)
+        self.report_status = ctk.CTkLabel(self.header, text="", font=("Consolas", 10), text_color=THEME["DIM"])
+        self.report_status.pack(side="left", padx=10)
+
         # UPDATED: Switch Name
         ctk.CTkSwitch(self.header, text="SHOW_QUARTERS", font=("Consolas", 11),
                       progress_color=THEME["DIM"], button_color="white", button_hover_color="gray",
                       fg_color="#333", variable=self.show_personal_var, command=self.refresh_tasks).pack(side="right",
                                                                                                          padx=10)
 
+        STARTUP.mark("header")
+
         # --- NEW: FLIGHT DECK ---
-        self.flight_deck = FlightDeck(self.fg_layer, self.fc)
+        self.flight_deck = FlightDeck(self.fg_layer, self.fc, self.db_worker, self.scheduler)
         self.flight_deck.pack(fill="x", padx=10, pady=10)
+        STARTUP.mark("flight deck")
 
         # Tabs
-        self.tabs = ctk.CTkTabview(self.fg_layer, fg_color="transparent", text_color=THEME["FG"],
+        self.tabs = ctk.CTkTabview(self.fg_layer, command=self.on_tab_change, fg_color="transparent",
+                                   text_color=THEME["FG"],
                                    segmented_button_fg_color="black",
                                    segmented_button_selected_color="#222", segmented_button_selected_hover_color="#333",
                                    segmented_button_unselected_color="black",
@@ -709,119 +1044,230 @@ class TodoApp(ctk.CTk):
         self.tab_active = self.tabs.add("BRIDGE_COMMAND")
         self.tab_history = self.tabs.add("BRIDGE_ARCHIVES")
 
-        # --- ARCHIVE FILTER BAR (NEW) ---
-        self.archive_filter_btn = ctk.CTkSegmentedButton(self.tab_history,
-                                                         values=["2 WEEKS", "1 MONTH", "CUSTOM"],
-                                                         command=self.on_archive_filter_change,
-                                                         font=THEME["FONT_MONO"],
-                                                         fg_color="black", selected_color=THEME["DIM"],
-                                                         selected_hover_color=THEME["FG"],
-                                                         unselected_color="black", unselected_hover_color="#111",
-                                                         corner_radius=0, border_width=1)
-        self.archive_filter_btn.set("2 WEEKS")
-        self.archive_filter_btn.pack(fill="x", padx=20, pady=(0, 10))
-
-        self.active_frame = ctk.CTkScrollableFrame(self.tab_active, fg_color="transparent")
+        # Windowed lists: only on-screen rows exist as widgets, recycled from a small pool
+        self.active_frame = VirtualTaskList(self.tab_active, self._create_row, self._update_row)
         self.active_frame.pack(fill="both", expand=True, pady=(0, 20))
-
-        self.history_frame = ctk.CTkScrollableFrame(self.tab_history, fg_color="transparent")
-        self.history_frame.pack(fill="both", expand=True, pady=(0, 20))
+        STARTUP.mark("tabs + task list")
 
         self.refresh_tasks()
-        self.update_timers()
+        self.scheduler.every("task_timers", 1000, self.update_timers, delay_ms=0)
+        self.scheduler.every("archive_tiering", ARCHIVE_TIERING_MS, self.compact_archive, delay_ms=60 * 1000)
+        self.scheduler.every("ledger_compaction", LEDGER_COMPACTION_MS, self.compact_ledger, delay_ms=2 * 60 * 1000)
+        self.bind("<F12>", lambda e: self.open_scheduler_debug())
+        # A 0 ms timer would fire before the window is even mapped; wait for the toplevel's <Map> instead
+        self._first_map_bind = self.bind("<Map>", self._on_first_map, add="+")
+
+    # --- DEFERRED STARTUP ---
+    def _on_first_map(self, event):
+        # <Map> on the toplevel is also delivered for every child widget that gets mapped
+        if event.widget is not self: return
+        self.unbind("<Map>", self._first_map_bind)
+        # Tk draws the widgets from idle callbacks queued by the map; run after those
+        self.after_idle(self._after_first_paint)
+
+    def _after_first_paint(self):
+        # Runs once the window is mapped and drawn: start the cosmetic layers
+        self.update_idletasks()
+        STARTUP.mark("first paint")
+        width, height = self.winfo_width(), self.winfo_height()
+        self.bg_matrix = MatrixRainLite(self, width=width, height=height, pad_size=BORDER_PAD, scheduler=self.scheduler)
+        self.bg_matrix.place(x=0, y=0, relwidth=1, relheight=1)
+        try:
+            self.bg_matrix.tk.call('lower', self.bg_matrix._w)
+        except:
+            pass
+        self.flight_deck.start()
+        STARTUP.mark("matrix + typewriter")
+        STARTUP.report()
+
+    def on_tab_change(self):
+        if self.tabs.get() == "BRIDGE_ARCHIVES" and not self.history_built:
+            self._build_history_tab()
+
+    def _build_history_tab(self):
+        # The archive tab is built (and its rows loaded) the first time it's opened
+        self.history_built = True
+        with STARTUP.section("archive tab"):
+            # --- ARCHIVE FILTER BAR (NEW) ---
+            self.archive_filter_btn = ctk.CTkSegmentedButton(self.tab_history,
+                                                             values=["2 WEEKS", "1 MONTH", "CUSTOM"],
+                                                             command=self.on_archive_filter_change,
+                                                             font=THEME["FONT_MONO"],
+                                                             fg_color="black", selected_color=THEME["DIM"],
+                                                             selected_hover_color=THEME["FG"],
+                                                             unselected_color="black", unselected_hover_color="#111",
+                                                             corner_radius=0, border_width=1)
+            self.archive_filter_btn.set("2 WEEKS")
+            self.archive_filter_btn.pack(fill="x", padx=20, pady=(0, 10))
+
+            # Full-text search over archived names + notes, within the selected period
+            self.archive_search_entry = ctk.CTkEntry(self.tab_history, placeholder_text="SEARCH_ARCHIVES...",
+                                                     font=THEME["FONT_MONO"], fg_color="#111", border_color="#333",
+                                                     text_color=THEME["FG"], corner_radius=0)
+            self.archive_search_entry.pack(fill="x", padx=20, pady=(0, 10))
+            self.archive_search_entry.bind("<KeyRelease>", self.on_archive_search_key)
+
+            self.history_frame = VirtualTaskList(self.tab_history, self._create_row, self._update_row,
+                                                 on_near_end=self.load_next_archive_page)
+            self.history_frame.pack(fill="both", expand=True, pady=(0, 20))
+        STARTUP.report("Startup (archive tab opened)")
+        self.refresh_tasks()
+
+    # --- BACKGROUND DB ---
+    def run_write(self, fn, *args, on_done=None, batch=True):
+        # Runs a mutation on the DB worker; by default the task lists refresh once it has committed
+        if on_done is None:
+            on_done = lambda _: self.refresh_tasks()
+        return self.db_worker.submit_write(fn, *args, on_done=on_done, batch=batch)
+
+    def compact_archive(self):
+        # Moving rows between tiers changes nothing on screen, so there is no refresh afterwards. Unbatched:
+        # each move commits its copy before its delete
+        self.db_worker.submit_write(self.db.compact_archive, ARCHIVE_COLD_AFTER_DAYS, key="archive_tiering",
+                                    batch=False)
+
+    def compact_ledger(self):
+        # Day-level distance readings and per-task totals are unchanged, so nothing on screen needs a refresh
+        self.db_worker.submit_write(self.db.compact_distance_ledger, LEDGER_COMPACT_AFTER_DAYS,
+                                    key="ledger_compaction")
+
+    def stop_task_timer(self, task_id):
+        def work():
+            # One transaction for the session insert, the time propagation and the distance gain
+            with self.db.batch():
+                elapsed_seconds = self.db.stop_timer(task_id)
+                return self.fc.travel(elapsed_seconds, task_id) if elapsed_seconds > 0 else (0, [])
+
+        def done(result):
+            km_added, crossed = result
+            if km_added > 0:
+                self.on_task_stopped(km_added, crossed)
+            # Elapsed time is propagated to every ancestor, so those rows change too
+            self.refresh_rows(task_id, include_ancestors=True)
+
+        self.db_worker.submit_write(work, on_done=done)
 
     # --- GAMIFICATION CALLBACKS ---
-    def on_task_stopped(self, elapsed_seconds):
-        # 1. Convert Time to Distance
-        km_added = self.fc.convert_seconds_to_km(elapsed_seconds)
+    def on_task_stopped(self, km_added, crossed=()):
+        # 1. Time was converted to distance on the DB worker (see stop_task_timer)
         # 2. Update HUD
         self.flight_deck.update_nav_data()
-        # 3. Log a random message
-        self.flight_deck.push_message()
+        if self.map_log is not None and self.map_log.winfo_exists() and self.map_log.winfo_viewable():
+            # An open nav chart follows the odometer
+            self.db_worker.submit_read(self.db.get_total_distance, on_done=self.map_log.set_km)
+        # 3. Log every milestone passed (a long session can cross several), or a random message
+        if crossed:
+            self.flight_deck.announce_milestones(crossed)
+        else:
+            self.flight_deck.push_message()
         # 4. Optional debug print
         print(f"DEBUG: Traveled {km_added} KM")
 
     # --- MAP LOG ---
     def open_map_log(self):
-        MapLogWindow(self, self.fc)
+        self.db_worker.submit_read(self.db.get_total_distance, on_done=self.show_map_log)
+
+    def show_map_log(self, km):
+        # One window for the whole session; re-opening just updates the cards whose state changed
+        if self.map_log is None or not self.map_log.winfo_exists():
+            self.map_log = MapLogWindow(self, self.fc, km, self.scheduler)
+            return
+        self.map_log.set_km(km)
+        self.map_log.deiconify()
+        self.map_log.lift()
 
     # --- ARCHIVE FILTER LOGIC ---
     def on_archive_filter_change(self, value):
         if value == "2 WEEKS":
             self.history_min_date = (datetime.now() - timedelta(weeks=2)).strftime("%Y-%m-%d %H:%M:%S")
+            self.reset_archive_pages()
             self.refresh_tasks()
         elif value == "1 MONTH":
             self.history_min_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+            self.reset_archive_pages()
             self.refresh_tasks()
         elif value == "CUSTOM":
             DateFilterDialog(self, self.set_custom_date)
 
     def set_custom_date(self, date_str):
         self.history_min_date = date_str
+        self.reset_archive_pages()
+        self.refresh_tasks()
+
+    def reset_archive_pages(self):
+        # A new period or query: drop the queued page load, ignore one already running, start again from page one
+        self.archive_generation += 1
+        self.db_worker.cancel_read("archive_page")
+        self.archive_page_loading = False
+        self.archive_cursor = None
+        self.archive_loaded = 0
+
+    def load_next_archive_page(self):
+        if self.archive_cursor is None or self.archive_page_loading: return
+        self.archive_page_loading = True
+        generation = self.archive_generation
+        self.db_worker.submit_read(self.db.get_archived_page, self.history_min_date, self.archive_cursor,
+                                   ARCHIVE_PAGE_SIZE, key="archive_page",
+                                   on_done=lambda page: self.append_archive_page(page, generation))
+
+    def append_archive_page(self, page, generation):
+        if generation != self.archive_generation: return
+        self.archive_page_loading = False
+        self.archive_cursor = self._archive_cursor_after(page, ARCHIVE_PAGE_SIZE)
+        self.archive_loaded += len(page)
+        self.history_frame.append_rows(self.history_rows(page))
+
+    def _archive_cursor_after(self, rows, limit):
+        # A short page means the period has nothing older left
+        if len(rows) < limit: return None
+        return rows[-1]['completed_at'], rows[-1]['id']
+
+    def on_archive_search_key(self, event=None):
+        # Re-arming the same job name restarts the wait, so the query only runs once typing pauses
+        self.scheduler.once("archive_search", SEARCH_DEBOUNCE_MS, self.run_archive_search)
+
+    def run_archive_search(self):
+        query = self.archive_search_entry.get().strip()
+        if query == self.archive_query: return
+        self.archive_query = query
+        self.reset_archive_pages()
         self.refresh_tasks()
 
     def open_add_dialog(self):
         TaskDialog(self, self.add_task_to_db, include_category=True)
 
     def add_task_to_db(self, name, eta, category):
-        self.db.add_task(name, due_date=eta, category=category)
-        self.refresh_tasks()
+        self.run_write(self.db.add_task, name, eta, category)
 
     def finish_day(self):
-        self.db.archive_all_completed()
-        self.refresh_tasks()
+        self.run_write(self.db.archive_all_completed)
 
     def toggle_fold(self, task_id):
         if task_id in self.folded_parents:
             self.folded_parents.remove(task_id)
         else:
             self.folded_parents.add(task_id)
-        self.refresh_tasks()
+        # Folding only changes which rows are shown; re-render from the last snapshot without touching the DB
+        self.render_active()
 
     # --- SINGLE TASK REPORT ---
     def generate_task_specific_report(self, task_id):
-        hierarchy = self.db.get_task_hierarchy(task_id)
-        if not hierarchy: return
-
-        root_task = hierarchy[0]
-        report = [
-            f"# PROJECT STATUS REPORT: {root_task['task_name']}",
-            f"Generated: {datetime.now().strftime('%Y-%m-%d')}",
-            "--------------------------------------------"
-        ]
-
-        for t in hierarchy:
-            indent = ""
-            if t['id'] != root_task['id']:
-                indent = "  ↳ "
-
-            status_icon = "✅" if t['status'] == 'COMPLETED' else "🚧"
-            line = f"{indent}{status_icon} {t['task_name']} [{t['status']}]"
-            report.append(line)
-
-            if t['notes'] and t['notes'].strip():
-                note_lines = t['notes'].strip().split('\n')
-                for note in note_lines:
-                    report.append(f"{indent}    📝 NOTE: {note}")
-
-        report_text = "\n".join(report)
-
-        if self.include_prompt_var.get():
-            ai_context = """I am providing a status dump for a specific project hierarchy.
-Please summarize the status of this project.
-1. Identify the main goal (the root task).
-2. List what is Completed vs Pending.
-3. SUMMARIZE the "Notes" attached to tasks to explain technical details or blockers.
-
-Data:
------
-"""
-            report_text = ai_context + report_text
-
-        self.clipboard_clear()
-        self.clipboard_append(report_text)
-        self.update()
-        tk.messagebox.showinfo("Report Ready", "Project Report (with Notes) copied to clipboard!")
+        path = self.ask_report_path("project_report")
+        if path == "": return  # save dialog cancelled
+        progress = self.start_report_progress("PROJECT_REPORT")
+        self.db_worker.submit_read(
+            self.stream_project_report, task_id, datetime.now(), self.include_prompt_var.get(), path, progress,
+            on_done=lambda result: self.finish_report(result, path, "Report Ready",
+                                                      "Project Report (with Notes) copied to clipboard!"))
+
+    def stream_project_report(self, task_id, today, include_prompt, path, progress):
+        # Runs on the DB worker: rows go from the cursor through the report buffer without being collected
+        lines = project_report_lines(self.db.iter_task_hierarchy(task_id), today, include_prompt)
+        try:
+            return stream_report(lines, path=path, progress=progress)
+        except OSError as e:
+            logger.error(f"Report write failed: {e}")
+            return e
 
     # --- REPORT DIALOG ---
     def show_report_dialog(self):
@@ -860,6 +1306,9 @@ Data:
 
         rpt_btn("[ GENERATE CUSTOM ]", "custom")
 
+        ctk.CTkCheckBox(main, text="SAVE_TO_FILE (instead of clipboard)", variable=self.report_to_file_var,
+                        font=THEME["FONT_MONO"], fg_color=THEME["DIM"], hover_color=THEME["FG"]).pack(pady=(15, 5))
+
     # --- REPORT GENERATION LOGIC ---
     def generate_report(self, mode, dialog_window):
         today = datetime.now()
@@ -890,140 +1339,213 @@ Data:
         s_str = start_date.strftime("%Y-%m-%d %H:%M:%S")
         e_str = end_date.strftime("%Y-%m-%d %H:%M:%S")
 
-        tasks = self.db.get_tasks_for_report(s_str, e_str)
-
-        report = [
-            f"# Work Report: {title_str}\n"
-            f"*Generated on {today.strftime('%Y-%m-%d')}*\n"
-        ]
-
-        completed = [t for t in tasks if t['status'] in ['COMPLETED', 'ARCHIVED']]
-        pending = [t for t in tasks if t['status'] not in ['COMPLETED', 'ARCHIVED']]
-
-        def format_task_line(t):
-            if not t['parent_name']:
-                return f"\n### 🏆 {t['task_name']}"
-            else:
-                return f"* **{t['task_name']}** (Part of \"{t['parent_name']}\")"
-
-        report.append("## ✅ Completed / Delivered")
-        if completed:
-            for t in completed: report.append(format_task_line(t))
-        else:
-            report.append("* No completed items recorded for this period.")
-
-        report.append("\n## 🚧 In Progress / Pending")
-        if pending:
-            for t in pending: report.append(format_task_line(t))
-        else:
-            report.append("* No pending items.")
-
-        report_text = "\n".join(report)
-
-        if self.include_prompt_var.get():
-            ai_instructions = """I am pasting a weekly work report generated by my task manager. Please summarize my work based on the following rules:
-
-1. STRUCTURE EXPLANATION:
-   - Items marked with "🏆" are MAIN PROJECTS.
-   - Items with bullet points "*" are SUBTASKS.
-   - If a bullet point says (Part of "Project Name"), it belongs to that parent project.
-
-2. HOW TO INTERPRET PROGRESS:
-   - If a "🏆 Main Project" appears in the "✅ Completed" section, announce that the ENTIRE project is finished.
-   - If a "🏆 Main Project" appears in "🚧 Pending", but one of its subtasks appears in "✅ Completed", report this as "Progress made on [Project Name]".
-
-3. DESIRED OUTPUT:
-   - Write a professional summary of what was achieved.
-   - Highlight full project completions first.
-   - List specific progress on ongoing projects second.
-
-Here is the report data:
------------------------
-"""
-            report_text = ai_instructions + report_text
-
+        path = self.ask_report_path(f"work_report_{s_str[:10]}_{e_str[:10]}")
+        if path == "": return
+
+        # Query and text assembly stream on the DB worker; only the clipboard touch happens on the Tk thread
+        progress = self.start_report_progress("WORK_REPORT")
+        self.db_worker.submit_read(
+            self.stream_week_report, s_str, e_str, title_str, today, self.include_prompt_var.get(), path, progress,
+            on_done=lambda result: self.finish_report(result, path, "Report Generated",
+                                                      "Work Report copied to clipboard!"))
+
+    def stream_week_report(self, s_str, e_str, title_str, today, include_prompt, path, progress):
+        # Runs on the DB worker; each section is its own cursor, read in chunks
+        completed = self.db.iter_tasks_for_report(s_str, e_str, completed=True)
+        pending = self.db.iter_tasks_for_report(s_str, e_str, completed=False)
+        lines = week_report_lines(completed, pending, title_str, today, include_prompt)
+        try:
+            return stream_report(lines, path=path, progress=progress)
+        except OSError as e:
+            logger.error(f"Report write failed: {e}")
+            return e
+
+    # --- REPORT OUTPUT ---
+    def ask_report_path(self, default_name):
+        # None: the report goes to the clipboard. "": the save dialog was cancelled.
+        if not self.report_to_file_var.get(): return None
+        return filedialog.asksaveasfilename(title="Save report", defaultextension=".md",
+                                            initialfile=f"{default_name}.md",
+                                            filetypes=[("Markdown", "*.md"), ("Text", "*.txt")]) or ""
+
+    def start_report_progress(self, title):
+        self.report_progress = ReportProgress(title)
+        self.scheduler.every("report_progress", 200, self.show_report_progress, delay_ms=0)
+        return self.report_progress
+
+    def show_report_progress(self):
+        self.report_status.configure(text=self.report_progress.describe())
+
+    def finish_report(self, result, path, title, clipboard_msg):
+        self.scheduler.cancel("report_progress")
+        self.report_status.configure(text="")
+        if isinstance(result, OSError):
+            tk.messagebox.showerror("Error", f"Could not write the report:\n{result}")
+            return
+        if not result: return
+        if path:
+            tk.messagebox.showinfo(title, f"Report saved to:\n{path}")
+            return
         self.clipboard_clear()
-        self.clipboard_append(report_text)
+        self.clipboard_append(result)
         self.update()
-        tk.messagebox.showinfo("Report Generated", "Work Report copied to clipboard!")
+        tk.messagebox.showinfo(title, clipboard_msg)
 
     # --- REFRESH LOGIC ---
     def refresh_tasks(self):
-        for w in self.active_frame.winfo_children(): w.destroy()
-        for w in self.history_frame.winfo_children(): w.destroy()
-
-        roots = self.db.get_tasks(parent_id=None)
-
-        # TAB 1: ACTIVE (Tree)
-        active_roots = [t for t in roots if t['status'] != 'ARCHIVED']
-        work_active = [t for t in active_roots if t['category'] == 'Work']
-        personal_active = [t for t in active_roots if t['category'] == 'Personal']
-
-        # Helper to draw Big Header
-        def draw_header(parent, icon, text):
-            # Create a frame to hold the two labels side by side
-            f = ctk.CTkFrame(parent, fg_color="transparent")
-            f.pack(fill="x", padx=10, pady=(15, 5))
-            # Huge Icon
-            ctk.CTkLabel(f, text=icon, font=THEME["FONT_SECTION_ICON"], text_color=THEME["DIM"]).pack(side="left")
-            # Medium-Large Text (Padding Left to separate)
-            ctk.CTkLabel(f, text=text, font=THEME["FONT_SECTION_TEXT"], text_color=THEME["DIM"]).pack(side="left",
-                                                                                                      padx=10)
-
-        if self.show_personal_var.get() and personal_active:
+        # Coalesced on the DB worker: any number of calls while a load is queued cost one load and one redraw
+        categories = ["Personal", "Work"] if self.show_personal_var.get() else ["Work"]
+        history_min_date = self.history_min_date if self.history_built else None
+        # Reload every archive page already shown, so a refresh doesn't throw the reader back to page one
+        history_limit = max(ARCHIVE_PAGE_SIZE, self.archive_loaded)
+        self.db_worker.submit_read(self.load_snapshot, categories, self.history_built, history_min_date,
+                                   self.archive_query, history_limit, key="refresh", on_done=self.apply_snapshot)
+
+    def load_snapshot(self, categories, include_history, history_min_date, history_query="",
+                      history_limit=ARCHIVE_PAGE_SIZE):
+        # Runs on the DB worker thread
+        # TAB 1: ACTIVE (Tree) - whole forest in a single query, children pre-attached
+        active_roots = self.db.load_forest(categories=categories, include_archived=False)
+        # TAB 2: HISTORY - uses history_min_date based on Segmented Button; skipped until the tab is opened.
+        # With a search query it shows the best matches in that period instead.
+        # The plain archive is the first history_limit rows of a paged list; search results are a single page.
+        if not include_history:
+            archived, history_limit = None, None
+        elif history_query:
+            archived, history_limit = self.db.search(history_query, status="ARCHIVED", start_date=history_min_date,
+                                                     limit=SEARCH_RESULT_LIMIT), None
+        else:
+            archived = self.db.get_archived_page(min_date=history_min_date, limit=history_limit)
+        return active_roots, archived, history_limit
+
+    def apply_snapshot(self, snapshot):
+        self.active_roots, archived, history_limit = snapshot
+        self.render_active()
+        if archived is None: return
+
+        # The list is replaced, so a page requested against the old one no longer lines up
+        self.reset_archive_pages()
+        if history_limit:
+            self.archive_cursor = self._archive_cursor_after(archived, history_limit)
+            self.archive_loaded = len(archived)
+        self.history_frame.set_rows(self.history_rows(archived))
+
+    def history_rows(self, archived):
+        history_rows = []
+        for t in archived:
+            display_task = dict(t)
+            if t['parent_name']:
+                display_task['task_name'] = f"{t['task_name']} (Part of \"{t['parent_name']}\")"
+            history_rows.append((("task", t['id']), ("task", display_task, 0, False, False, True)))
+        return history_rows
+
+    def render_active(self):
+        work_active = [t for t in self.active_roots if t['category'] == 'Work']
+        personal_active = [t for t in self.active_roots if t['category'] == 'Personal']
+
+        self.task_nodes = {}
+        self.running_timers = {}
+        active_rows = []
+        if personal_active:
             # UPDATED: Personal Header using DANTE_QUARTERS with Paw Prints
-            draw_header(self.active_frame, "🐾", "DANTE_QUARTERS")
-            for task in personal_active: self.render_task_node(task, 0, self.active_frame, is_history=False)
+            active_rows.append((("header", "Personal"), ("header", "🐾", "DANTE_QUARTERS")))
+            for task in personal_active: self.collect_task_rows(task, 0, active_rows)
 
         if work_active:
             # UPDATED: Work Header
-            draw_header(self.active_frame, "⚗", "WORK")
-            for task in work_active: self.render_task_node(task, 0, self.active_frame, is_history=False)
+            active_rows.append((("header", "Work"), ("header", "⚗", "WORK")))
+            for task in work_active: self.collect_task_rows(task, 0, active_rows)
 
-        # TAB 2: HISTORY
-        # UPDATED: Uses self.history_min_date based on Segmented Button
-        archived = self.db.get_all_archived_tasks(min_date=self.history_min_date)
-        for t in archived:
-            display_task = dict(t)
-            if t['parent_name']:
-                display_task['task_name'] = f"{t['task_name']} (Part of \"{t['parent_name']}\")"
-            TaskWidget(self.history_frame, display_task, self.db, self.refresh_tasks, self.toggle_fold, self,
-                       is_history=True)
+        self.active_frame.set_rows(active_rows)
 
-    def render_task_node(self, task, depth, parent_frame, is_history):
+    def collect_task_rows(self, task, depth, rows):
         is_folded = task['id'] in self.folded_parents
 
-        children = self.db.get_tasks(parent_id=task['id'])
-        active_children = [c for c in children if c['status'] != 'ARCHIVED']
+        # Children come pre-loaded from load_forest (archived ones already excluded)
+        active_children = task['children']
         has_children = len(active_children) > 0
 
-        TaskWidget(parent_frame, task, self.db, self.refresh_tasks, self.toggle_fold, self, is_folded, depth,
-                   is_history, has_children)
+        self.task_nodes[task['id']] = task
+        self.track_timer(task)
+        rows.append((("task", task['id']), ("task", task, depth, is_folded, has_children, False)))
 
+        if is_folded: return
         for child in active_children:
-            if is_folded: continue
-            self.render_task_node(child, depth + 1, parent_frame, is_history)
+            self.collect_task_rows(child, depth + 1, rows)
+
+    def _create_row(self, frame, spec):
+        if spec[0] == "header":
+            _, icon, text = spec
+            return SectionHeader(frame, icon, text)
+        _, task, depth, is_folded, has_children, is_history = spec
+        return TaskWidget(frame, task, self.db, self.refresh_tasks, self.toggle_fold, self, is_folded, depth,
+                          is_history, has_children)
+
+    def _update_row(self, widget, spec):
+        if spec[0] == "header":
+            widget.set_text(spec[1], spec[2])
+        else:
+            _, task, depth, is_folded, has_children, _ = spec
+            widget.update_task(task, is_folded, depth, has_children)
+
+    def refresh_rows(self, task_id, include_ancestors=False):
+        # Single-row update for actions that don't change the tree shape (RUN/STOP, notes, edits)
+        node = self.task_nodes.get(task_id)
+        if node is None: return self.refresh_tasks()
+        ids = [task_id]
+        while include_ancestors and node['parent_id'] in self.task_nodes:
+            node = self.task_nodes[node['parent_id']]
+            ids.append(node['id'])
+        self.db_worker.submit_read(lambda: [self.db.get_task_by_id(i) for i in ids], on_done=self.apply_rows)
+
+    def apply_rows(self, rows):
+        for row in rows:
+            node = self.task_nodes.get(row['id']) if row else None
+            spec = self.active_frame.get_spec(("task", row['id'])) if row else None
+            if node is None or spec is None:
+                return self.refresh_tasks()
+            # Patch the snapshot node in place so a later fold re-render sees the new values too
+            node.update(dict(row))
+            self.track_timer(node)
+            _, _, depth, is_folded, has_children, is_history = spec
+            self.active_frame.update_spec(("task", node['id']), ("task", node, depth, is_folded, has_children,
+                                                                 is_history))
+
+    def track_timer(self, task):
+        # Keeps running_timers in step with a task's RUN/STOP state; the start time is parsed once here
+        if task['current_session_start']:
+            start = datetime.strptime(task['current_session_start'], "%Y-%m-%d %H:%M:%S").timestamp()
+            self.running_timers[task['id']] = (start, task['subtree_seconds'])
+        else:
+            self.running_timers.pop(task['id'], None)
 
     def update_timers(self):
-        current_time = datetime.now()
-        for widget in self.active_frame.winfo_children():
-            # Must check if it is a TaskWidget because we now have Header Frames in the list too
-            if isinstance(widget, TaskWidget) and widget.task_data['current_session_start']:
-                start_dt = datetime.strptime(widget.task_data['current_session_start'], "%Y-%m-%d %H:%M:%S")
-                elapsed = int((current_time - start_dt).total_seconds())
-                total = widget.task_data['time_spent'] + elapsed
-                widget.timer_label.configure(text=format_seconds(total), text_color="#00FF41")
-        self.after(5000, self.update_timers)
+        # Touches only running tasks that are on screen, and only when the shown text actually changes
+        now = time.time()
+        for task_id, (start, stored_seconds) in self.running_timers.items():
+            widget = self.active_frame.row_widget(("task", task_id))
+            if widget is None: continue
+            time_str = format_seconds(stored_seconds + int(now - start))
+            if time_str != widget.time_str:
+                widget.time_str = time_str
+                widget.timer_label.configure(text=time_str, text_color="#00FF41")
+
+    def open_scheduler_debug(self):
+        SchedulerDebugWindow(self, self.scheduler)
 
     def on_closing(self):
-        self.bg_matrix.running = False
-        self.db.close()
+        # Lets queued writes finish on the worker. If it is still mid-job (a long compact_archive, say),
+        # the writer connection is still in use and must not be flushed or closed from this thread.
+        if self.db_worker.shutdown():
+            self.db.flush()  # Commit anything still pending in a write batch before the connection goes away
+            self.db.close()
+        self.scheduler.stop()
         self.destroy()
 
 
 if __name__ == "__main__":
     app = TodoApp()
-    app.bind("<FocusOut>", lambda e: setattr(app.bg_matrix, 'running', False))
-    app.bind("<FocusIn>", lambda e: [setattr(app.bg_matrix, 'running', True), app.bg_matrix.animate()])
+    app.bind("<FocusOut>", lambda e: app.scheduler.set_focus(False))
+    app.bind("<FocusIn>", lambda e: app.scheduler.set_focus(True))
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import argparse
+import sys
+
+from database import TodoDatabase
+
+
+# Offline maintenance for todo.db. Run with the app closed: python3 maintenance.py <command> [--db todo.db]
+
+def rebuild_rollups(db, args):
+    # Recomputes task_rollups (subtree time + open/completed counts) from tasks and sessions
+    db.rebuild_rollups()
+    row = db.conn.execute("SELECT COUNT(*), COALESCE(SUM(own_seconds), 0) FROM task_rollups").fetchone()
+    print(f"✅ Rebuilt rollups for {row[0]} tasks ({row[1]}s tracked).")
+
+
+def rebuild_time_buckets(db, args):
+    # Re-aggregates the day/week time buckets from the raw sessions table
+    db.rebuild_time_buckets()
+    row = db.conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(seconds), 0) FROM task_time_buckets WHERE grain = 'day'").fetchone()
+    print(f"✅ Rebuilt {row[0]} daily task buckets ({row[1]}s tracked).")
+
+
+def compact_ledger(db, args):
+    # Folds distance-ledger entries older than --days into one checkpoint per day and task
+    folded = db.compact_distance_ledger(older_than_days=args.days or 90)
+    print(f"✅ Folded {folded} ledger entries into checkpoints.")
+
+
+def rebuild_distance(db, args):
+    # Re-derives the odometer and per-task distance from the ledger
+    db.rebuild_distance()
+    print(f"✅ Odometer rebuilt from ledger: {db.get_total_distance():,} KM.")
+
+
+def rebuild_search_index(db, args):
+    # Re-indexes every task name and note into the full-text search table
+    if not db.rebuild_search_index():
+        print("❌ This SQLite build has no FTS5; search falls back to LIKE.")
+        return
+    row = db.conn.execute("SELECT COUNT(*) FROM tasks_fts").fetchone()
+    print(f"✅ Search index rebuilt for {row[0]} tasks.")
+
+
+def compact_archive(db, args):
+    # Moves archived trees finished more than --days ago into the cold archive file (todo_cold.db)
+    days = args.days or 180
+    total = 0
+    while True:
+        moved = db.compact_archive(older_than_days=days)
+        if not moved: break
+        total += moved
+    print(f"✅ Moved {total} archived tasks older than {days} days to the cold tier.")
+
+
+COMMANDS = {
+    "rebuild-rollups": rebuild_rollups,
+    "rebuild-time-buckets": rebuild_time_buckets,
+    "compact-ledger": compact_ledger,
+    "rebuild-distance": rebuild_distance,
+    "rebuild-search-index": rebuild_search_index,
+    "compact-archive": compact_archive,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance tasks for the task database.")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--db", default="todo.db", help="database file (default: todo.db)")
+    parser.add_argument("--days", type=int, help="compact-ledger: keep this many days in full (default 90); "
+                                                 "compact-archive: move trees older than this (default 180)")
+    args = parser.parse_args(argv)
+
+    db = TodoDatabase(args.db)
+    try:
+        COMMANDS[args.command](db, args)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# Report text builders. Pure functions over DB rows (no Tk), so the worker thread and the
+# headless benchmarks can call them directly.
+#
+# Reports are produced as a stream of lines: the *_report_lines generators take row iterators (a DB cursor
+# in the app) and stream_report joins the lines through a bounded buffer into a string or straight into a file.
+import os
+
+REPORT_BUFFER_CHARS = 64 * 1024  # text held before it is handed to the sink
+
+PROJECT_PROMPT = """I am providing a status dump for a specific project hierarchy.
+Please summarize the status of this project.
+1. Identify the main goal (the root task).
+2. List what is Completed vs Pending.
+3. SUMMARIZE the "Notes" attached to tasks to explain technical details or blockers.
+
+Data:
+-----
+"""
+
+WEEK_PROMPT = """I am pasting a weekly work report generated by my task manager. Please summarize my work based on the following rules:
+
+1. STRUCTURE EXPLANATION:
+   - Items marked with "🏆" are MAIN PROJECTS.
+   - Items with bullet points "*" are SUBTASKS.
+   - If a bullet point says (Part of "Project Name"), it belongs to that parent project.
+
+2. HOW TO INTERPRET PROGRESS:
+   - If a "🏆 Main Project" appears in the "✅ Completed" section, announce that the ENTIRE project is finished.
+   - If a "🏆 Main Project" appears in "🚧 Pending", but one of its subtasks appears in "✅ Completed", report this as "Progress made on [Project Name]".
+
+3. DESIRED OUTPUT:
+   - Write a professional summary of what was achieved.
+   - Highlight full project completions first.
+   - List specific progress on ongoing projects second.
+
+Here is the report data:
+-----------------------
+"""
+
+
+def format_seconds(seconds):
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+# --- LINE GENERATORS ---
+def project_report_lines(rows, today, include_prompt):
+    # rows: the project's hierarchy, root first, depth-first (TodoDatabase.iter_task_hierarchy)
+    rows = iter(rows)
+    root_task = next(rows, None)
+    if root_task is None: return
+
+    if include_prompt:
+        yield PROJECT_PROMPT[:-1]  # the line break comes from the join
+    yield f"# PROJECT STATUS REPORT: {root_task['task_name']}"
+    yield f"Generated: {today.strftime('%Y-%m-%d')}"
+    yield "--------------------------------------------"
+
+    for t in _chain_first(root_task, rows):
+        indent = ""
+        if t['id'] != root_task['id']:
+            indent = "  ↳ "
+
+        status_icon = "✅" if t['status'] == 'COMPLETED' else "🚧"
+        yield f"{indent}{status_icon} {t['task_name']} [{t['status']}]"
+
+        if t['notes'] and t['notes'].strip():
+            for note in t['notes'].strip().split('\n'):
+                yield f"{indent}    📝 NOTE: {note}"
+
+
+def week_report_lines(completed, pending, title_str, today, include_prompt):
+    # completed / pending: row iterators for the two sections (TodoDatabase.iter_tasks_for_report)
+    if include_prompt:
+        yield WEEK_PROMPT[:-1]
+    yield (f"# Work Report: {title_str}\n"
+           f"*Generated on {today.strftime('%Y-%m-%d')}*\n")
+
+    def format_task_line(t):
+        tracked = f" ⏱ {format_seconds(t['period_seconds'])}" if t['period_seconds'] else ""
+        if not t['parent_name']:
+            return f"\n### 🏆 {t['task_name']}{tracked}"
+        else:
+            return f"* **{t['task_name']}** (Part of \"{t['parent_name']}\"){tracked}"
+
+    yield "## ✅ Completed / Delivered"
+    empty = True
+    for t in completed:
+        empty = False
+        yield format_task_line(t)
+    if empty:
+        yield "* No completed items recorded for this period."
+
+    yield "\n## 🚧 In Progress / Pending"
+    empty = True
+    for t in pending:
+        empty = False
+        yield format_task_line(t)
+    if empty:
+        yield "* No pending items."
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+# --- OUTPUT ---
+def stream_report(lines, path=None, progress=None, buffer_chars=REPORT_BUFFER_CHARS):
+    # Joins the lines with "\n", holding at most ~buffer_chars of text before handing it on. With a path the
+    # text goes straight into that file and the path is returned; otherwise the report text is returned.
+    # progress(lines_done, chars_done) is called after every flush and once at the end.
+    if path is None:
+        parts = []
+        _pump(lines, parts.append, progress, buffer_chars)
+        return "".join(parts)
+
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            _pump(lines, f.write, progress, buffer_chars)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _pump(lines, write, progress, buffer_chars):
+    buf, size = [], 0
+    lines_done = chars_done = 0
+    for line in lines:
+        buf.append(line)
+        size += len(line) + 1
+        if size >= buffer_chars:
+            chars_done += _flush(buf, write, lines_done)
+            lines_done += len(buf)
+            buf, size = [], 0
+            if progress: progress(lines_done, chars_done)
+    if buf:
+        chars_done += _flush(buf, write, lines_done)
+        lines_done += len(buf)
+    if progress: progress(lines_done, chars_done)
+
+
+def _flush(buf, write, lines_done):
+    chunk = "\n".join(buf)
+    if lines_done: chunk = "\n" + chunk
+    write(chunk)
+    return len(chunk)
+
+
+class ReportProgress:
+    """Progress of a report being streamed on the DB worker, read by a Tk job. Plain attribute writes only."""
+
+    def __init__(self, title):
+        self.title = title
+        self.lines = 0
+        self.chars = 0
+
+    def __call__(self, lines_done, chars_done):
+        self.lines = lines_done
+        self.chars = chars_done
+
+    def describe(self):
+        return f"{self.title}: {self.lines:,} LINES / {self.chars // 1024:,} KB"
+
+
+# --- WHOLE REPORTS ---
+def build_project_report(hierarchy, today, include_prompt):
+    # hierarchy: TodoDatabase.get_task_hierarchy output (root first, depth-first)
+    return "\n".join(project_report_lines(hierarchy, today, include_prompt))
+
+
+def build_week_report(tasks, title_str, today, include_prompt):
+    # tasks: rows from TodoDatabase.get_tasks_for_report
+    completed = (t for t in tasks if t['status'] in ['COMPLETED', 'ARCHIVED'])
+    pending = (t for t in tasks if t['status'] not in ['COMPLETED', 'ARCHIVED'])
+    return "\n".join(week_report_lines(completed, pending, title_str, today, include_prompt))
@@ -0,0 +1,137 @@
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger("MarioSys")
+
+PRIORITY_HIGH = 0  # app plumbing (DB results)
+PRIORITY_NORMAL = 1  # things the user reads (clock, task timers, typing)
+PRIORITY_COSMETIC = 2  # decoration (Matrix rain, cursor blink)
+
+
+class _Job:
+    __slots__ = ("name", "fn", "interval_ms", "priority", "cosmetic", "repeat", "due", "runs", "costs")
+
+    def __init__(self, name, fn, interval_ms, priority, cosmetic, repeat, due):
+        self.name = name
+        self.fn = fn
+        self.interval_ms = interval_ms
+        self.priority = priority
+        self.cosmetic = cosmetic
+        self.repeat = repeat
+        self.due = due
+        self.runs = 0
+        self.costs = deque(maxlen=30)  # ms per run, most recent last
+
+
+class TickScheduler:
+    """Every timed callback in the app, driven by a single after() that is always armed for the next due job.
+
+    Jobs are named: scheduling a name that already exists replaces it, so a restarted effect can never leave a
+    second chain running. Jobs due in the same tick run once each, highest priority first; a periodic job that
+    fell behind runs once and is rescheduled from now rather than replaying the runs it missed. A periodic job
+    may return a number to set its next interval (ms). Cosmetic jobs are held while the window is unfocused.
+    """
+
+    def __init__(self, tk_root):
+        self.tk_root = tk_root
+        self.jobs = {}
+        self.focused = True
+        self.running = True
+        self._after_id = None
+        self._armed_for = None
+
+    # --- JOBS ---
+    def every(self, name, interval_ms, fn, priority=PRIORITY_NORMAL, cosmetic=False, delay_ms=None):
+        first = interval_ms if delay_ms is None else delay_ms
+        self.jobs[name] = _Job(name, fn, interval_ms, priority, cosmetic, True, self._now() + first)
+        self._arm()
+        return name
+
+    def once(self, name, delay_ms, fn, priority=PRIORITY_NORMAL, cosmetic=False):
+        self.jobs[name] = _Job(name, fn, delay_ms, priority, cosmetic, False, self._now() + delay_ms)
+        self._arm()
+        return name
+
+    def cancel(self, name):
+        # A wake-up armed for this job just finds nothing due
+        self.jobs.pop(name, None)
+
+    def set_focus(self, focused):
+        if focused == self.focused: return
+        self.focused = focused
+        self._arm()
+
+    def stop(self):
+        self.running = False
+        self.jobs.clear()
+        if self._after_id is not None:
+            self.tk_root.after_cancel(self._after_id)
+            self._after_id = None
+
+    # --- LOOP ---
+    def _now(self):
+        return time.perf_counter() * 1000
+
+    def _active(self, job):
+        return self.focused or not job.cosmetic
+
+    def _arm(self):
+        if not self.running: return
+        due = min((j.due for j in self.jobs.values() if self._active(j)), default=None)
+        if due is None: return
+        if self._after_id is not None:
+            if self._armed_for <= due: return
+            self.tk_root.after_cancel(self._after_id)
+        self._armed_for = due
+        self._after_id = self.tk_root.after(max(0, int(due - self._now())), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        now = self._now() + 1  # after() may fire a hair early
+        due = sorted((j for j in self.jobs.values() if self._active(j) and j.due <= now),
+                     key=lambda j: (j.priority, j.due))
+        for job in due:
+            if self.jobs.get(job.name) is not job: continue  # cancelled or replaced earlier in this tick
+            start = time.perf_counter()
+            try:
+                result = job.fn()
+            except Exception as e:
+                logger.error(f"Scheduled job '{job.name}' failed: {e}")
+                result = None
+            job.costs.append((time.perf_counter() - start) * 1000)
+            job.runs += 1
+            if self.jobs.get(job.name) is not job: continue  # the job rescheduled itself under the same name
+            if job.repeat:
+                if isinstance(result, (int, float)): job.interval_ms = result
+                job.due = self._now() + job.interval_ms
+            else:
+                del self.jobs[job.name]
+        self._arm()
+
+    # --- DEBUG ---
+    def snapshot(self):
+        # One dict per job, highest priority first: what the debug view shows
+        rows = []
+        for job in sorted(self.jobs.values(), key=lambda j: (j.priority, j.name)):
+            costs = list(job.costs)
+            rows.append({
+                "name": job.name,
+                "priority": job.priority,
+                "interval_ms": job.interval_ms if job.repeat else None,
+                "paused": not self._active(job),
+                "runs": job.runs,
+                "last_ms": costs[-1] if costs else 0.0,
+                "avg_ms": sum(costs) / len(costs) if costs else 0.0,
+                "max_ms": max(costs) if costs else 0.0,
+            })
+        return rows
+
+    def describe(self):
+        lines = [f"{'JOB':<24}{'PRI':>4}{'EVERY':>8}{'RUNS':>8}{'LAST':>9}{'AVG':>9}{'MAX':>9}"]
+        for r in self.snapshot():
+            every = "once" if r["interval_ms"] is None else f"{int(r['interval_ms'])}ms"
+            name = r["name"] + (" (paused)" if r["paused"] else "")
+            lines.append(f"{name:<24}{r['priority']:>4}{every:>8}{r['runs']:>8}"
+                         f"{r['last_ms']:>7.2f}ms{r['avg_ms']:>7.2f}ms{r['max_ms']:>7.2f}ms")
+        return "\n".join(lines)
@@ -0,0 +1,50 @@
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("MarioSys")
+
+
+class StartupProfiler:
+    """Wall-clock timings for app startup, from the moment this module is imported.
+
+    mark(name) records the time since the previous mark (or since import, for the first one), so
+    "imports" is simply the first mark after main.py's import block. section(name) times a block.
+    Timings are always collected (it's a handful of perf_counter calls); report() only logs them when
+    profiling is enabled with --profile-startup or MARIO_PROFILE_STARTUP=1.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.t0 = time.perf_counter()
+        self.last = self.t0
+        self.rows = []  # (name, ms)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.rows.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.rows.append((name, (now - start) * 1000))
+            self.last = now
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.t0) * 1000
+
+    def report(self, title="Startup"):
+        if not self.enabled: return
+        logger.info(f"{title}: {self.elapsed_ms():.1f} ms since launch")
+        for name, ms in self.rows:
+            logger.info(f"  {name:<28}{ms:>8.1f} ms")
+
+
+STARTUP = StartupProfiler(enabled="--profile-startup" in sys.argv or os.environ.get("MARIO_PROFILE_STARTUP") == "1")